@@ -1,31 +1,31 @@
 import time
 from collections import deque
-from itertools import permutations
 
-class AC3_4x4:
-    def __init__(self, n, regions):
-        self.n = n
-        self.grid = [[0] * n for _ in range(n)]
-        self.domains = [[set(range(1, n + 1)) for _ in range(n)] for _ in range(n)]
-        self.regions = regions
+import bitdomain
+import puzzle
+
+class AC3_4x4(puzzle.GridSolver):
+    def __init__(self, n, regions=None, stats=True):
+        super().__init__(n, regions, stats=stats)
+        self.n = self.grid_size
         
         self.ac3_time = 0
         self.backtrack_time = 0
         self.total_solve_time = 0
     
     def solve(self):
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        ac3_start = time.time()
+        ac3_start = time.perf_counter()
         if not self.run_ac3():
             return False
-        self.ac3_time = (time.time() - ac3_start) * 1000
+        self.ac3_time = (time.perf_counter() - ac3_start) * 1000
         
-        backtrack_start = time.time()
+        backtrack_start = time.perf_counter()
         solved = self.backtrack(0, 0)
-        self.backtrack_time = (time.time() - backtrack_start) * 1000
+        self.backtrack_time = (time.perf_counter() - backtrack_start) * 1000
         
-        self.total_solve_time = (time.time() - start_time) * 1000
+        self.total_solve_time = (time.perf_counter() - start_time) * 1000
         
         return solved
     
@@ -39,8 +39,10 @@ class AC3_4x4:
         
         while queue:
             row1, col1, row2, col2 = queue.popleft()
+            self.stats.revisions += 1
             if self.revise(row1, col1, row2, col2):
                 if not self.domains[row1][col1]:
+                    self.stats.ac3_failures += 1
                     return False
                 self.add_row_column_arcs(queue, row1, col1)
                 self.add_regions_arcs(queue, row1, col1)
@@ -54,23 +56,23 @@ class AC3_4x4:
                 queue.append((row, col, i, col))
     
     def add_regions_arcs(self, queue, row, col):
-        for region in self.regions:
-            for cell in region['cells']:
-                if cell == (row, col):
-                    for other_cell in region['cells']:
-                        if other_cell != cell:
-                            queue.append((row, col, other_cell[0], other_cell[1]))
+        index = self.cell_region[row][col]
+        if index >= 0:
+            for other_cell in self.regions[index].cells:
+                if other_cell != (row, col):
+                    queue.append((row, col, other_cell[0], other_cell[1]))
     
     def revise(self, row1, col1, row2, col2):
         revised = False
-        to_remove = set()
+        to_remove = 0
         
-        for val1 in self.domains[row1][col1]:
-            if all(val1 == val2 for val2 in self.domains[row2][col2]):
-                to_remove.add(val1)
+        for val1 in bitdomain.values(self.domains[row1][col1]):
+            if all(val1 == val2 for val2 in bitdomain.values(self.domains[row2][col2])):
+                to_remove |= bitdomain.bit(val1)
                 revised = True
         
-        self.domains[row1][col1] -= to_remove
+        self.domains[row1][col1] &= ~to_remove
+        self.stats.prunes += bitdomain.size(to_remove)
         return revised
     
     def backtrack(self, row, col):
@@ -78,50 +80,33 @@ class AC3_4x4:
             return self.validate_regions()
         
         next_row, next_col = (row + 1, 0) if col == self.n - 1 else (row, col + 1)
+        self.stats.nodes += 1
         
-        for value in sorted(self.domains[row][col]):
+        for value in bitdomain.values(self.domains[row][col]):
             if self.is_valid_assignment(row, col, value):
-                self.grid[row][col] = value
-                if self.backtrack(next_row, next_col):
+                mark = self.trail.mark()
+                self.assign(row, col, value)
+                if self.prune_line_peers(row, col, value) and self.backtrack(next_row, next_col):
                     return True
-                self.grid[row][col] = 0
+                self.stats.backtracks += 1
+                self.unassign(row, col)
+                self.trail.undo(mark)
         
         return False
     
-    def is_valid_assignment(self, row, col, value):
-        return all(self.grid[row][i] != value for i in range(self.n)) and \
-    all(self.grid[i][col] != value for i in range(self.n))
-    
     def validate_regions(self):
-        for region in self.regions:
-            values = [self.grid[row][col] for row, col in region['cells']]
+        for index, region in enumerate(self.regions):
+            values = [self.grid[row][col] for row, col in region.cells]
             if 0 in values:
                 return False
-            if not self.check_region_constraint(values, region['operation'], region['target']):
+            if not self.puzzle.checkers[index](values):
                 return False
         return True
     
-    def check_region_constraint(self, values, operation, target):
-        if operation == '+':
-            return sum(values) == target
-        elif operation == '*':
-            result = 1
-            for v in values:
-                result *= v
-            return result == target
-        elif operation == '-':
-            return any(abs(a - b) == target for a, b in permutations(values, 2))
-        elif operation == '/':
-            return any(max(a, b) / min(a, b) == target for a, b in permutations(values, 2) if min(a, b) != 0)
-        return False
-    
-    def print_grid(self):
-        for row in self.grid:
-            print(row)
-    
     def print_performance_metrics(self):
         print("\nPerformance Metrics:")
         print(f"AC-3 Algorithm Time: {self.ac3_time:.3f} ms")
+        print(f"Search stats: {self.stats.as_dict()}")
 
 # Example cages for a 4x4 KenKen puzzle
 regions = [
@@ -134,10 +119,11 @@ regions = [
     {"cells": [(3, 0), (3, 1)], "operation": '-', "target": 3},
 ]
 
-# Solve the puzzle
-solver = AC3_4x4(4, regions)
-if solver.solve():
-    solver.print_grid()
-    solver.print_performance_metrics()
-else:
-    print("No solution found.")
+if __name__ == "__main__":
+    # Solve the puzzle
+    solver = AC3_4x4(4, regions)
+    if solver.solve():
+        solver.print_grid()
+        solver.print_performance_metrics()
+    else:
+        print("No solution found.")
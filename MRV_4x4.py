@@ -1,48 +1,28 @@
 import itertools
 import time
 
-class MRV_4x4:
-    def __init__(self, size, regions):
-        self.N = size
-        self.grid = [[0] * size for _ in range(size)]
-        self.domains = [[set(range(1, size + 1)) for _ in range(size)] for _ in range(size)]
-        self.regions = regions
+import bitdomain
+import mrv_buckets
+import puzzle
+
+class MRV_4x4(puzzle.GridSolver):
+    def __init__(self, size, regions=None, stats=True):
+        super().__init__(size, regions, stats=stats)
+        self.N = self.grid_size
+        self.buckets = mrv_buckets.DomainBuckets(self.domains, self.peers)
+        self.trail.on_change = self.buckets.resize
         self.execution_time = 0
     
-    def is_valid_assignment(self, row, col, value):
-        
-        for i in range(self.N):
-            if self.grid[row][i] == value or self.grid[i][col] == value:
-                return False
-        return True
-    
     def validate_regions(self):
-        for cells, operation, target in self.regions:
-            values = [self.grid[r][c] for r, c in cells]
-            if 0 in values:
-                continue  
-            if not self.check_region_constraint(values, operation, target):
+        for index in range(len(self.regions)):
+            if not self.puzzle.check_region(index, self.grid):
                 return False
         return True
     
-    def check_region_constraint(self, values, operation, target):
-        if operation == '+':
-            return sum(values) == target
-        elif operation == '*':
-            result = 1
-            for v in values:
-                result *= v
-            return result == target
-        elif operation == '-':
-            return abs(values[0] - values[1]) == target
-        elif operation == '/':
-            return max(values) / min(values) == target
-        return False
-    
     def solve(self):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = self.backtrack()
-        self.execution_time = (time.time() - start_time) * 1000  
+        self.execution_time = (time.perf_counter() - start_time) * 1000  
         return result
     
     def backtrack(self):
@@ -50,34 +30,24 @@ class MRV_4x4:
         row, col = self.select_mrv_variable()
         if row == -1:
             return True  # Solution found
+        self.stats.nodes += 1
         
-        for value in sorted(self.domains[row][col]):
+        for value in bitdomain.values(self.domains[row][col]):
             if self.is_valid_assignment(row, col, value):
-                self.grid[row][col] = value
-                if self.validate_regions():
+                mark = self.trail.mark()
+                self.assign(row, col, value)
+                if self.validate_regions() and self.prune_line_peers(row, col, value):
                     if self.backtrack():
                         return True
-                self.grid[row][col] = 0
+                self.stats.backtracks += 1
+                self.unassign(row, col)
+                self.trail.undo(mark)
         
         return False
     
     def select_mrv_variable(self):
-        min_remaining_values = float('inf')
-        selected_var = (-1, -1)
-        
-        for row in range(self.N):
-            for col in range(self.N):
-                if self.grid[row][col] == 0:
-                    remaining_values = len(self.domains[row][col])
-                    if remaining_values < min_remaining_values:
-                        min_remaining_values = remaining_values
-                        selected_var = (row, col)
-        
-        return selected_var
-    
-    def print_grid(self):
-        for row in self.grid:
-            print(row)
+        cell = self.buckets.select()
+        return cell if cell is not None else (-1, -1)
     
     def print_execution_time(self):
         print(f"Execution Time: {self.execution_time:.3f} ms")
@@ -0,0 +1,242 @@
+import arc_queue
+import bitdomain
+import cage_gac
+import cbj
+import dlx
+import kenken_cnf
+import latin_logic
+import mrv_buckets
+import puzzle
+import stack_search
+
+class CSP(puzzle.GridSolver):
+    def __init__(self, grid_size, regions=None, value_order='ascending', seed=None, stats=True):
+        super().__init__(grid_size, regions, value_order, seed, stats)
+        self._initial_constraints()
+
+    def ac3(self, latin=True, smallest_first=False, arcs=None):
+        # Arcs are region indexes (cage constraints) or ((xi, yi), (xj, yj)) pairs
+        # for the row/column all-different constraints when latin is set.
+        # Without an explicit arcs list every constraint is queued.
+        start = self.trail.mark()
+        consistent = self._ac3(latin, smallest_first, arcs)
+        if not consistent:
+            self.stats.ac3_failures += 1
+        if self.stats:
+            self.stats.prunes += sum(bitdomain.size(removed) for (_, _, removed) in self.trail.entries[start:])
+        return consistent
+
+    def _ac3(self, latin, smallest_first, arcs):
+        stats = self.stats
+        queue = arc_queue.ArcQueue(self.arc_priority if smallest_first else None)
+        if arcs is not None:
+            for arc in arcs:
+                queue.push(arc)
+        else:
+            for index in range(len(self.regions)):
+                queue.push(index)
+            if latin:
+                for x in range(self.grid_size):
+                    for y in range(self.grid_size):
+                        for peer in self.line_peers[x][y]:
+                            queue.push(((x, y), peer))
+
+        while queue:
+            arc = queue.pop()
+            stats.revisions += 1
+            if isinstance(arc, int):
+                changed = self.revise_region(arc)
+                if changed is None:
+                    return False  # No solution
+            else:
+                if not self.revise(*arc):
+                    continue
+                (xi, yi) = arc[0]
+                if not self.domains[xi][yi]:
+                    return False
+                changed = [arc[0]]
+                if self.cell_region[xi][yi] >= 0:
+                    queue.push(self.cell_region[xi][yi])
+            if latin:
+                for (xk, yk) in changed:
+                    for peer in self.line_peers[xk][yk]:
+                        queue.push((peer, (xk, yk)))
+        return True
+
+    def revise(self, xi, xj):
+        # xi cannot take the value xj is fixed to
+        domain_j = self.domains[xj[0]][xj[1]]
+        if bitdomain.size(domain_j) == 1:
+            return self.trail.remove(xi[0], xi[1], domain_j) != 0
+        return False
+
+    def revise_region(self, index):
+        return cage_gac.revise_cage(self.domains, self.regions[index].cells, self.region_tuples[index], self.trail)
+
+    def arc_priority(self, arc):
+        if isinstance(arc, int):
+            return min(bitdomain.size(self.domains[x][y]) for (x, y) in self.regions[arc].cells)
+        (xi, yi) = arc[0]
+        return bitdomain.size(self.domains[xi][yi])
+
+    def solve(self, mode='backtrack', cache=None):
+        # cache: a SolutionCache that answers puzzles it has seen before
+        if cache is not None:
+            return cache.solve_with(self, self.search, mode)
+        return self.search(mode)
+
+    def search(self, mode='backtrack'):
+        if mode == 'dlx':
+            return self.solve_dlx()
+        if mode == 'sat':
+            return self.solve_sat()
+        if mode == 'cbj':
+            # Forward checking with conflict-directed backjumping and nogoods
+            return cbj.solve(self)
+        # Enforce arc-consistency using AC-3 before backtracking
+        if mode == 'mac':
+            return self.prepare_mac() and self.backtrack_mac()
+        if mode == 'stack':
+            # The same MAC search without recursion (stack_search.py)
+            return stack_search.solve(self)
+        if not self.presolve():
+            return False  # No solution if propagation fails
+        return self.backtrack()
+
+    def solve_dlx(self):
+        # Exact cover over the valid cage tuples (Algorithm X on dancing links)
+        # instead of the cell-by-cell search
+        cover, rows = dlx.kenken_cover(self.puzzle)
+        chosen = next(cover.search(), None)
+        self.stats.nodes += cover.nodes
+        self.stats.backtracks += cover.backtracks
+        if chosen is None:
+            return False
+        self.assign_grid(dlx.cover_to_grid(self.puzzle, rows, chosen))
+        return True
+
+    def solve_sat(self):
+        # CNF encoding solved by the built-in CDCL solver
+        grid, solver = kenken_cnf.solve(self.puzzle)
+        self.stats.nodes += solver.decisions
+        self.stats.backtracks += solver.conflicts
+        if grid is None:
+            return False
+        self.assign_grid(grid)
+        return True
+
+    def presolve(self):
+        # AC-3 and the latin_logic rules (hidden singles, naked pairs/triples)
+        # to a common fixpoint; every cell left with one value is then assigned,
+        # so a puzzle that logic alone solves needs no search node
+        arcs = None
+        while True:
+            if not self.ac3(arcs=arcs):
+                return False
+            changed = latin_logic.revise_lines(self.domains, self.grid_size, trail=self.trail)
+            if changed is None:
+                return False
+            if not changed:
+                break
+            arcs = []
+            for (x, y) in changed:
+                if self.cell_region[x][y] >= 0:
+                    arcs.append(self.cell_region[x][y])
+                arcs.extend((peer, (x, y)) for peer in self.line_peers[x][y])
+
+        for x in range(self.grid_size):
+            for y in range(self.grid_size):
+                if self.grid[x][y] == 0 and bitdomain.size(self.domains[x][y]) == 1:
+                    self.assign(x, y, bitdomain.lowest(self.domains[x][y]))
+        return True
+
+    def prepare_mac(self):
+        # Initial propagation plus the MRV buckets that backtrack_mac selects
+        # from, holding only the cells presolve left open
+        if not self.presolve():
+            return False
+        self.buckets = mrv_buckets.DomainBuckets(self.domains, self.peers)
+        self.trail.on_change = self.buckets.resize
+        for x in range(self.grid_size):
+            for y in range(self.grid_size):
+                if self.grid[x][y]:
+                    self.buckets.remove(x, y)
+        return True
+
+    def backtrack(self):
+        cell = self.take_unassigned_cell()
+        if cell is None:
+            return True
+        self.stats.nodes += 1
+
+        x, y = cell
+        for value in self.ordered_values(x, y):
+            if self.is_consistent(x, y, value):
+                mark = self.trail.mark()
+                self.assign(x, y, value)
+                if self.forward_check(x, y, value) and self.backtrack():
+                    return True
+                self.stats.backtracks += 1
+                self.unassign(x, y)
+                self.trail.undo(mark)
+        return False
+
+    def backtrack_mac(self):
+        # Maintaining arc consistency: every assignment is propagated to a fixpoint
+        cell = self.select_unassigned_cell()
+        if cell is None:
+            return True
+        self.stats.nodes += 1
+
+        x, y = cell
+        for value in self.ordered_values(x, y):
+            mark = self.trail.mark()
+            self.assign(x, y, value)
+            if self.propagate(x, y) and self.backtrack_mac():
+                return True
+            self.stats.backtracks += 1
+            self.unassign(x, y)
+            self.trail.undo(mark)
+        return False
+
+    def solutions(self):
+        # Yields a copy of every solution, lazily, from the same MAC search as
+        # solve('mac') run on stack_search.StackSearch, so deep grids do not
+        # recurse. Closing the generator early undoes the open assignments.
+        if not self.prepare_mac():
+            return
+        yield from stack_search.StackSearch(self).solutions()
+
+    def count_solutions(self, limit=None):
+        # Stops at limit solutions; count_solutions(2) == 1 means the puzzle is unique
+        if limit is not None and limit <= 0:
+            return 0
+        count = 0
+        found = self.solutions()
+        for _ in found:
+            count += 1
+            if limit is not None and count >= limit:
+                found.close()
+                break
+        return count
+
+    def is_unique(self):
+        return self.count_solutions(2) == 1
+
+    def propagate(self, x, y):
+        self.trail.restrict(x, y, bitdomain.bit(self.grid[x][y]))
+        index = self.cell_region[x][y]
+        arcs = [index] if index >= 0 else []
+        arcs += [(peer, (x, y)) for peer in self.line_peers[x][y]]
+        return self.ac3(arcs=arcs)
+
+    def select_unassigned_cell(self):
+        # MRV: smallest live domain, from the buckets set up by prepare_mac
+        return self.buckets.select()
+
+    def take_unassigned_cell(self):
+        for i in range(self.grid_size):
+            for j in range(self.grid_size):
+                if self.grid[i][j] == 0:
+                    return (i, j)
+        return None
@@ -0,0 +1,35 @@
+import heapq
+from collections import deque
+
+
+class ArcQueue:
+    # Work queue for AC-3: an arc already waiting in the queue is not added again.
+    # With a priority function the arc with the smallest key is revised first,
+    # otherwise arcs come out in FIFO order.
+    def __init__(self, priority=None):
+        self.priority = priority
+        self.fifo = deque()
+        self.heap = []
+        self.queued = set()
+        self.pushed = 0
+
+    def push(self, arc):
+        if arc in self.queued:
+            return
+        self.queued.add(arc)
+        if self.priority is None:
+            self.fifo.append(arc)
+        else:
+            self.pushed += 1
+            heapq.heappush(self.heap, (self.priority(arc), self.pushed, arc))
+
+    def pop(self):
+        if self.priority is None:
+            arc = self.fifo.popleft()
+        else:
+            arc = heapq.heappop(self.heap)[2]
+        self.queued.discard(arc)
+        return arc
+
+    def __len__(self):
+        return len(self.queued)
@@ -0,0 +1,167 @@
+# Solve a puzzle file line by line and stream one JSON result per puzzle:
+#
+#   python batch.py puzzles/instances.txt --strategy mac --output results.jsonl
+#   python batch.py corpus.txt --workers 8 --timeout 5 --unordered
+#
+# Only the puzzles being solved are held in memory, so files of any length work.
+# A line that fails to parse produces {"line": n, "error": ...} and the run goes on.
+# With --workers the lines are sent, still in their compact text form, to a pool
+# of worker processes in small chunks.
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import puzzle_io
+import search_stats
+from solution_cache import SolutionCache
+from strategies import STRATEGIES
+
+
+class PuzzleTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise PuzzleTimeout()
+
+
+@contextmanager
+def deadline(seconds):
+    # Raises PuzzleTimeout in the block after `seconds`, using SIGALRM where the
+    # platform has it; None (or no SIGALRM) means no limit
+    if seconds is None or not hasattr(signal, 'setitimer'):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def solve_line(number, line, strategy='mac', timeout=None, stats=False, cache=None):
+    try:
+        name, model = puzzle_io.parse_line(line)
+    except ValueError as error:
+        return {"line": number, "error": str(error)}
+
+    counts = search_stats.SearchStats() if stats else None
+    hits = cache.hits if cache is not None else 0
+    start = time.perf_counter()
+    try:
+        with deadline(timeout):
+            if cache is not None:
+                grid = cache.solve(model, STRATEGIES[strategy], stats=counts)
+            else:
+                grid = STRATEGIES[strategy](model, stats=counts)
+    except PuzzleTimeout:
+        return {"line": number, "name": name, "timeout": True, "ms": round(timeout * 1000, 3)}
+    elapsed = (time.perf_counter() - start) * 1000
+    result = {"line": number, "name": name, "solved": grid is not None, "grid": grid, "ms": round(elapsed, 3)}
+    if cache is not None and cache.hits > hits:
+        result["cached"] = True
+    elif counts is not None:
+        result["stats"] = counts.as_dict()
+    return result
+
+
+def puzzle_lines(lines):
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield number, line
+
+
+def solve_lines(lines, strategy='mac', timeout=None, stats=False, cache=None):
+    for number, line in puzzle_lines(lines):
+        yield solve_line(number, line, strategy, timeout, stats, cache)
+
+
+def _solve_chunk(chunk, strategy, timeout, stats, cache_path):
+    cache = SolutionCache(cache_path) if cache_path is not None else None
+    try:
+        return [solve_line(number, line, strategy, timeout, stats, cache) for number, line in chunk]
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def solve_parallel(lines, strategy='mac', workers=None, timeout=None, ordered=True, chunk_size=16, stats=False,
+                   cache_path=None):
+    # Results come back in input order, or as soon as their chunk finishes when
+    # ordered is false. At most a few chunks per worker are in flight at a time.
+    workers = workers or os.cpu_count() or 1
+    pending = puzzle_lines(lines)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+
+        def submit_next():
+            chunk = list(islice(pending, chunk_size))
+            if chunk:
+                in_flight.append(executor.submit(_solve_chunk, chunk, strategy, timeout, stats, cache_path))
+            return bool(chunk)
+
+        while len(in_flight) < workers * 4 and submit_next():
+            pass
+        while in_flight:
+            if ordered:
+                done = [in_flight.popleft()]
+            else:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.remove(future)
+            for future in done:
+                yield from future.result()
+                submit_next()
+
+
+def solve_file(path, output, strategy='mac', workers=1, timeout=None, ordered=True, stats=False, cache_path=None):
+    # cache_path names a SolutionCache file shared by this run and later ones
+    cache = SolutionCache(cache_path) if cache_path is not None and workers == 1 else None
+    with open(path) as f:
+        if workers == 1:
+            results = solve_lines(f, strategy, timeout, stats, cache)
+        else:
+            results = solve_parallel(f, strategy, workers, timeout, ordered, stats=stats, cache_path=cache_path)
+        for result in results:
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+    if cache is not None:
+        cache.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve every puzzle in a puzzle file")
+    parser.add_argument("path")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default='mac')
+    parser.add_argument("--output", help="write results here instead of stdout")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes, 0 for one per CPU (default: solve in this process)")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per puzzle")
+    parser.add_argument("--unordered", action="store_true", help="write results as they finish")
+    parser.add_argument("--stats", action="store_true", help="add search counters to every result")
+    parser.add_argument("--cache", help="SQLite file of known solutions, created if missing")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    if args.output:
+        with open(args.output, 'w') as output:
+            solve_file(args.path, output, args.strategy, workers, args.timeout, not args.unordered, args.stats,
+                       args.cache)
+    else:
+        solve_file(args.path, sys.stdout, args.strategy, workers, args.timeout, not args.unordered, args.stats,
+                   args.cache)
+
+
+if __name__ == "__main__":
+    main()
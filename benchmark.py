@@ -0,0 +1,224 @@
+# Time every strategy on every puzzle of a puzzle file and report best/average/worst:
+#
+#   python benchmark.py
+#   python benchmark.py puzzles/instances.txt --repeat 50 --warmup 5 --json bench.json --csv bench.csv
+#   python benchmark.py --solver mac --solver mrv --chart bench.svg
+#
+# Puzzles are parsed and compiled before timing starts. Each timed run builds a
+# fresh solver from the compiled model and solves it, measured with
+# perf_counter_ns and the garbage collector paused (as timeit does). Nothing is
+# printed inside the timed region. The chart is drawn with matplotlib when it is
+# installed, otherwise it is written as a plain SVG.
+
+import argparse
+import csv
+import gc
+import json
+import math
+import statistics
+import sys
+import time
+
+import puzzle_io
+from batch import PuzzleTimeout, deadline
+from strategies import STRATEGIES
+
+FIELDS = ['solver', 'instance', 'size', 'runs', 'solved', 'timeout', 'best_ms', 'avg_ms', 'worst_ms', 'stdev_ms']
+
+
+def time_runs(strategy, model, repeat, warmup, timeout=None):
+    # Returns (solved, per-run nanoseconds) for `repeat` runs after `warmup`
+    # untimed ones. A run that exceeds timeout seconds raises PuzzleTimeout.
+    for _ in range(warmup):
+        with deadline(timeout):
+            strategy(model)
+    samples = []
+    grid = None
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            with deadline(timeout):
+                start = time.perf_counter_ns()
+                grid = strategy(model)
+                samples.append(time.perf_counter_ns() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return grid is not None and model.check_solution(grid), samples
+
+
+def summarize(solver, name, model, solved, samples):
+    ms = [sample / 1e6 for sample in samples]
+    if not ms:
+        return {"solver": solver, "instance": name, "size": model.grid_size, "runs": 0, "solved": False,
+                "timeout": True}
+    return {
+        "solver": solver,
+        "instance": name,
+        "size": model.grid_size,
+        "runs": len(ms),
+        "solved": solved,
+        "timeout": False,
+        "best_ms": round(min(ms), 4),
+        "avg_ms": round(statistics.fmean(ms), 4),
+        "worst_ms": round(max(ms), 4),
+        "stdev_ms": round(statistics.stdev(ms), 4) if len(ms) > 1 else 0.0,
+    }
+
+
+def run_benchmark(puzzles, solvers, repeat=20, warmup=2, timeout=None, progress=None):
+    # A solver that times out on a puzzle is reported with "timeout": true and
+    # no timings, and the benchmark moves on
+    results = []
+    for name, model in puzzles:
+        for solver in solvers:
+            try:
+                solved, samples = time_runs(STRATEGIES[solver], model, repeat, warmup, timeout)
+            except PuzzleTimeout:
+                solved, samples = False, []
+            results.append(summarize(solver, name, model, solved, samples))
+            if progress is not None:
+                progress(results[-1])
+    return results
+
+
+def write_json(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def write_csv(path, results):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def format_table(results):
+    lines = [f"{'solver':<8}{'instance':<14}{'runs':>6}{'best ms':>12}{'avg ms':>12}{'worst ms':>12}"]
+    for r in results:
+        if r['timeout']:
+            lines.append(f"{r['solver']:<8}{r['instance']:<14}{'timed out':>18}")
+            continue
+        lines.append(f"{r['solver']:<8}{r['instance']:<14}{r['runs']:>6}"
+                     f"{r['best_ms']:>12.3f}{r['avg_ms']:>12.3f}{r['worst_ms']:>12.3f}")
+    return '\n'.join(lines)
+
+
+def write_chart(path, results):
+    # Average time per solver and instance on a log scale, whiskers from best to
+    # worst. Returns the path written, or None when no run finished in time.
+    results = [r for r in results if not r['timeout']]
+    if not results:
+        return None
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        path = path if path.endswith('.svg') else path.rsplit('.', 1)[0] + '.svg'
+        return write_svg_chart(path, results)
+
+    instances = list(dict.fromkeys(r['instance'] for r in results))
+    solvers = list(dict.fromkeys(r['solver'] for r in results))
+    width = 0.8 / len(solvers)
+    fig, ax = plt.subplots(figsize=(2 + 2 * len(instances), 4))
+    for k, solver in enumerate(solvers):
+        rows = {r['instance']: r for r in results if r['solver'] == solver}
+        xs = [i + k * width for i, name in enumerate(instances) if name in rows]
+        avg = [rows[name]['avg_ms'] for name in instances if name in rows]
+        low = [rows[name]['avg_ms'] - rows[name]['best_ms'] for name in instances if name in rows]
+        high = [rows[name]['worst_ms'] - rows[name]['avg_ms'] for name in instances if name in rows]
+        ax.bar(xs, avg, width, yerr=[low, high], capsize=3, label=solver)
+    ax.set_xticks([i + width * (len(solvers) - 1) / 2 for i in range(len(instances))])
+    ax.set_xticklabels(instances)
+    ax.set_yscale('log')
+    ax.set_ylabel('ms per solve')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def write_svg_chart(path, results):
+    results = [r for r in results if not r['timeout']]
+    if not results:
+        return None
+    instances = list(dict.fromkeys(r['instance'] for r in results))
+    solvers = list(dict.fromkeys(r['solver'] for r in results))
+    colors = ['#4c72b0', '#dd8452', '#55a868', '#c44e52', '#8172b3', '#937860']
+    bar, gap, height, left, top = 18, 30, 300, 60, 20
+    low = math.floor(math.log10(max(min(r['best_ms'] for r in results), 1e-3)))
+    high = math.ceil(math.log10(max(r['worst_ms'] for r in results)))
+    high = max(high, low + 1)
+
+    def y(ms):
+        return top + height - (math.log10(max(ms, 10 ** low)) - low) / (high - low) * height
+
+    width = left + len(instances) * (len(solvers) * bar + gap) + 120
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height + top + 40}" '
+           f'font-family="sans-serif" font-size="11">']
+    for exponent in range(low, high + 1):
+        ty = y(10 ** exponent)
+        out.append(f'<line x1="{left}" y1="{ty:.1f}" x2="{width - 120}" y2="{ty:.1f}" stroke="#ddd"/>')
+        out.append(f'<text x="{left - 6}" y="{ty + 4:.1f}" text-anchor="end">{10 ** exponent:g} ms</text>')
+    for i, name in enumerate(instances):
+        x0 = left + gap / 2 + i * (len(solvers) * bar + gap)
+        for k, solver in enumerate(solvers):
+            for r in results:
+                if r['instance'] == name and r['solver'] == solver:
+                    x = x0 + k * bar
+                    out.append(f'<rect x="{x:.1f}" y="{y(r["avg_ms"]):.1f}" width="{bar - 2}" '
+                               f'height="{top + height - y(r["avg_ms"]):.1f}" fill="{colors[k % len(colors)]}"/>')
+                    cx = x + (bar - 2) / 2
+                    out.append(f'<line x1="{cx:.1f}" y1="{y(r["best_ms"]):.1f}" x2="{cx:.1f}" '
+                               f'y2="{y(r["worst_ms"]):.1f}" stroke="black"/>')
+        out.append(f'<text x="{x0 + len(solvers) * bar / 2:.1f}" y="{top + height + 16}" '
+                   f'text-anchor="middle">{name}</text>')
+    for k, solver in enumerate(solvers):
+        ly = top + 14 * k
+        out.append(f'<rect x="{width - 110}" y="{ly}" width="10" height="10" fill="{colors[k % len(colors)]}"/>')
+        out.append(f'<text x="{width - 95}" y="{ly + 9}">{solver}</text>')
+    out.append('</svg>')
+    with open(path, 'w') as f:
+        f.write('\n'.join(out) + '\n')
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the solvers on a puzzle file")
+    parser.add_argument("path", nargs="?", default="puzzles/instances.txt")
+    parser.add_argument("--solver", action="append", choices=sorted(STRATEGIES),
+                        help="strategy to time, may be repeated (default: all)")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per solver and puzzle")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed runs before timing")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="seconds allowed per run before a solver is skipped on that puzzle (default: 60)")
+    parser.add_argument("--json", help="write the statistics as JSON")
+    parser.add_argument("--csv", help="write the statistics as CSV")
+    parser.add_argument("--chart", help="write a chart (PNG etc. with matplotlib, SVG without)")
+    args = parser.parse_args(argv)
+
+    puzzles = list(puzzle_io.read_file(args.path))
+    solvers = args.solver or list(STRATEGIES)
+    results = run_benchmark(puzzles, solvers, args.repeat, args.warmup, args.timeout,
+                            progress=lambda r: print(f"{r['solver']} {r['instance']}: "
+                                                     + ("timed out" if r['timeout'] else f"{r['avg_ms']:.3f} ms"),
+                                                     file=sys.stderr))
+    print(format_table(results))
+    if args.json:
+        write_json(args.json, results)
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.chart:
+        path = write_chart(args.chart, results)
+        if path is None:
+            print("no timed results, chart skipped", file=sys.stderr)
+        else:
+            print(f"chart written to {path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
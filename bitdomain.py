@@ -0,0 +1,82 @@
+# Cell domains stored as integer bitmasks: value v is present when bit v is set.
+# Bit 0 is never used, so bit(0) can be cleared from any domain without effect
+# (an empty grid cell holds 0).
+
+
+def bit(value):
+    return 1 << value
+
+
+def full_domain(n):
+    return (1 << (n + 1)) - 2
+
+
+def new_domains(n):
+    full = full_domain(n)
+    return [[full] * n for _ in range(n)]
+
+
+def copy_domains(domains):
+    return [row[:] for row in domains]
+
+
+def from_values(values):
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+def size(mask):
+    return mask.bit_count()
+
+
+def contains(mask, value):
+    return (mask >> value) & 1 == 1
+
+
+def lowest(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+def highest(mask):
+    return mask.bit_length() - 1
+
+
+def remove(mask, value):
+    return mask & ~(1 << value)
+
+
+def values(mask):
+    # Lowest bit first, so iteration order matches sorted(set)
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def values_descending(mask):
+    while mask:
+        high = mask.bit_length() - 1
+        yield high
+        mask ^= 1 << high
+
+
+VALUE_ORDERS = ('ascending', 'descending', 'random')
+
+
+def ordered_values(mask, order='ascending', rng=None):
+    # Search order for a cell's values; 'random' shuffles with rng (a random.Random)
+    if order == 'ascending':
+        return values(mask)
+    if order == 'descending':
+        return values_descending(mask)
+    if order == 'random':
+        shuffled = to_list(mask)
+        rng.shuffle(shuffled)
+        return shuffled
+    raise ValueError(f"unknown value order {order!r}")
+
+
+def to_list(mask):
+    return list(values(mask))
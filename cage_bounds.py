@@ -0,0 +1,152 @@
+# Arithmetic propagators for cages, for the solvers that do not keep the full
+# tuple GAC of cage_gac going during search. Integer arithmetic only.
+#
+#   make_partial_checker: rejects a partly filled cage that can no longer reach
+#   its target (sum outside [filled + empty, filled + empty * N], product not
+#   dividing the target or too small to reach it, no partner for a '-' or '/'
+#   pair's filled value)
+#
+#   revise: narrows the cage's bitmask domains to the values that survive sum
+#   min/max bounds, divisor and product bounds for '*', or the partner values
+#   of a '-' or '/' pair, repeated until nothing changes
+
+
+def make_partial_checker(operation, target, grid_size):
+    # Checks a list of cage values in which 0 marks an empty cell
+    if operation == '+':
+        def check_sum(values):
+            empty = values.count(0)
+            total = sum(values)
+            return total + empty <= target <= total + empty * grid_size
+        return check_sum
+    if operation == '*':
+        def check_product(values):
+            product = 1
+            empty = 0
+            for v in values:
+                if v:
+                    product *= v
+                else:
+                    empty += 1
+            return target % product == 0 and product * grid_size ** empty >= target
+        return check_product
+    if operation == '-':
+        def check_difference(values):
+            if len(values) != 2 or values.count(0) != 1:
+                return True
+            filled = max(values)
+            return filled + target <= grid_size or filled - target >= 1
+        return check_difference
+    if operation == '/':
+        def check_division(values):
+            if len(values) != 2 or values.count(0) != 1:
+                return True
+            filled = max(values)
+            return filled * target <= grid_size or filled % target == 0
+        return check_division
+    return lambda values: True
+
+
+def value_range(low, high, grid_size):
+    # Bitmask of the values low..high, clipped to 1..grid_size
+    low = max(low, 1)
+    high = min(high, grid_size)
+    if low > high:
+        return 0
+    return ((1 << (high + 1)) - 1) & ~((1 << low) - 1)
+
+
+def sum_support(masks, target, grid_size):
+    lows = [(m & -m).bit_length() - 1 for m in masks]
+    highs = [m.bit_length() - 1 for m in masks]
+    total_low = sum(lows)
+    total_high = sum(highs)
+    return [value_range(target - (total_high - highs[k]), target - (total_low - lows[k]), grid_size)
+            for k in range(len(masks))]
+
+
+def product_support(masks, target, grid_size):
+    lows = [(m & -m).bit_length() - 1 for m in masks]
+    highs = [m.bit_length() - 1 for m in masks]
+    total_low = total_high = fixed_all = 1
+    for low, high in zip(lows, highs):
+        total_low *= low
+        total_high *= high
+        if low == high:
+            fixed_all *= low
+    supported = []
+    for k, mask in enumerate(masks):
+        # Products of the other cells' lows, highs and fixed values
+        low = total_low // lows[k]
+        high = total_high // highs[k]
+        fixed = fixed_all // lows[k] if lows[k] == highs[k] else fixed_all
+        if target % fixed:
+            return None
+        rest = target // fixed
+        keep = 0
+        while mask:
+            bit = mask & -mask
+            v = bit.bit_length() - 1
+            if rest % v == 0 and v * low <= target <= v * high:
+                keep |= bit
+            mask ^= bit
+        supported.append(keep)
+    return supported
+
+
+def pair_support(masks, operation, target, grid_size):
+    full = ((1 << (grid_size + 1)) - 1) ^ 1
+    supported = []
+    for mask in reversed(masks):
+        # Values the other cell can take given this cell's domain
+        if operation == '-':
+            supported.append(((mask << target) | (mask >> target)) & full)
+        else:
+            keep = 0
+            for v in range(1, grid_size + 1):
+                if (mask >> v) & 1:
+                    if v * target <= grid_size:
+                        keep |= 1 << (v * target)
+                    if v % target == 0:
+                        keep |= 1 << (v // target)
+            supported.append(keep)
+    return supported
+
+
+def support(masks, operation, target, grid_size):
+    # Per-cell masks of the values that pass the cage's arithmetic bounds, or
+    # None when the cage cannot be completed
+    if operation == '+':
+        return sum_support(masks, target, grid_size)
+    if operation == '*':
+        return product_support(masks, target, grid_size)
+    if operation in ('-', '/'):
+        if len(masks) != 2:
+            return masks
+        return pair_support(masks, operation, target, grid_size)
+    return [1 << target] * len(masks)
+
+
+def revise(domains, cells, operation, target, grid_size, trail=None):
+    # Same contract as cage_gac.revise_cage: returns the cells whose domain
+    # shrank, or None when some cell of the cage is left without a value
+    changed = []
+    while True:
+        masks = [domains[x][y] for (x, y) in cells]
+        if not all(masks):
+            return None
+        supported = support(masks, operation, target, grid_size)
+        if supported is None or any(not (m & s) for m, s in zip(masks, supported)):
+            return None
+        shrunk = False
+        for (x, y), mask, keep in zip(cells, masks, supported):
+            if mask & ~keep:
+                if trail is not None:
+                    trail.restrict(x, y, keep)
+                else:
+                    domains[x][y] &= keep
+                if (x, y) not in changed:
+                    changed.append((x, y))
+                shrunk = True
+        if not shrunk:
+            return changed
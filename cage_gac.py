@@ -0,0 +1,89 @@
+# Generalized arc consistency for cages: every cage's satisfying value tuples
+# are enumerated once, and a cell keeps a value only while some tuple that
+# fits inside the current domains still uses it.
+
+
+def make_checker(operation, target):
+    # Checks a complete list of cage values with integer arithmetic only
+    if operation == '+':
+        return lambda values: sum(values) == target
+    if operation == '*':
+        def check_product(values):
+            product = 1
+            for v in values:
+                product *= v
+            return product == target
+        return check_product
+    if operation == '-':
+        return lambda values: 2 * max(values) - sum(values) == target
+    if operation == '/':
+        def check_division(values):
+            largest = max(values)
+            rest = 1
+            for v in values:
+                rest *= v
+            rest //= largest
+            return largest == target * rest
+        return check_division
+    return lambda values: values[0] == target
+
+
+def cage_tuples(cells, operation, target, grid_size):
+    # Cells of the cage that share a row or column must differ
+    conflicts = [[j for j in range(i) if cells[i][0] == cells[j][0] or cells[i][1] == cells[j][1]]
+                 for i in range(len(cells))]
+    check = make_checker(operation, target)
+    tuples = []
+    current = []
+
+    def extend(i, partial):
+        if i == len(cells):
+            if check(current):
+                tuples.append(tuple(current))
+            return
+        for value in range(1, grid_size + 1):
+            if any(current[j] == value for j in conflicts[i]):
+                continue
+            if operation == '+':
+                if partial + value > target:
+                    break
+                next_partial = partial + value
+            elif operation == '*':
+                if target % (partial * value) != 0:
+                    continue
+                next_partial = partial * value
+            else:
+                next_partial = partial
+            current.append(value)
+            extend(i + 1, next_partial)
+            current.pop()
+
+    extend(0, 0 if operation == '+' else 1)
+    return tuples
+
+
+def revise_cage(domains, cells, tuples, trail=None):
+    # Returns the cells whose domain shrank, or None when the cage has no live tuple.
+    # With a trail the removals are recorded so that search can undo them.
+    supported = [0] * len(cells)
+    alive = False
+    for values in tuples:
+        for k, (x, y) in enumerate(cells):
+            if not (domains[x][y] >> values[k]) & 1:
+                break
+        else:
+            alive = True
+            for k, value in enumerate(values):
+                supported[k] |= 1 << value
+    if not alive:
+        return None
+
+    changed = []
+    for k, (x, y) in enumerate(cells):
+        if domains[x][y] & ~supported[k]:
+            if trail is not None:
+                trail.restrict(x, y, supported[k])
+            else:
+                domains[x][y] &= supported[k]
+            changed.append((x, y))
+    return changed
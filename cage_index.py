@@ -0,0 +1,43 @@
+# Lookup tables built once per puzzle so that constraint checks never have to
+# scan the region list or test membership in a region's cell list.
+
+
+def build_cell_region(grid_size, region_cells):
+    cell_region = [[-1] * grid_size for _ in range(grid_size)]
+    for index, cells in enumerate(region_cells):
+        for (x, y) in cells:
+            cell_region[x][y] = index
+    return cell_region
+
+
+def build_line_peers(grid_size):
+    # Cells sharing a row or a column with (x, y): the all-different neighbours
+    line_peers = [[None] * grid_size for _ in range(grid_size)]
+    for x in range(grid_size):
+        for y in range(grid_size):
+            line_peers[x][y] = [(x, j) for j in range(grid_size) if j != y] + \
+                [(i, y) for i in range(grid_size) if i != x]
+    return line_peers
+
+
+def build_peers(grid_size, region_cells, cell_region, line_peers):
+    # Row, column and cage mates of (x, y), each listed once
+    peers = [[None] * grid_size for _ in range(grid_size)]
+    for x in range(grid_size):
+        for y in range(grid_size):
+            cell_peers = list(line_peers[x][y])
+            seen = set(cell_peers)
+            if cell_region[x][y] >= 0:
+                for cell in region_cells[cell_region[x][y]]:
+                    if cell != (x, y) and cell not in seen:
+                        cell_peers.append(cell)
+                        seen.add(cell)
+            peers[x][y] = cell_peers
+    return peers
+
+
+def build_indexes(grid_size, region_cells):
+    cell_region = build_cell_region(grid_size, region_cells)
+    line_peers = build_line_peers(grid_size)
+    peers = build_peers(grid_size, region_cells, cell_region, line_peers)
+    return cell_region, line_peers, peers
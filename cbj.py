@@ -0,0 +1,144 @@
+# Forward checking with conflict-directed backjumping and bounded nogood
+# learning, run on a CSP after its initial AC-3 pass (CSP.solve('cbj')).
+#
+# Assignments are numbered by depth. Every value removed from a cell's domain
+# carries the set of depths that caused it: the assignment itself for a
+# row/column removal, and every assigned cell of the cage plus the reasons
+# already on its unassigned cells for a cage removal. When a cell runs out of
+# values, the union of those sets (its conflict set) names the assignments
+# responsible, and the search jumps straight back to the deepest of them
+# instead of the previous one. The assignments in the conflict set are also
+# stored as a nogood, if it has at most max_size members and there is room,
+# and a value that would complete a stored nogood is never tried.
+
+import cage_gac
+
+
+class BackjumpSearch:
+    def __init__(self, csp, max_size=4, max_nogoods=10000):
+        self.csp = csp
+        n = csp.grid_size
+        self.depth_of = [[-1] * n for _ in range(n)]
+        self.reasons = [[[] for _ in range(n)] for _ in range(n)]  # [(depth, depths), ...] per cell
+        self.touched = []                                           # cells given reasons, per depth
+        self.assigned = []                                          # (x, y) per depth
+        self.max_size = max_size
+        self.max_nogoods = max_nogoods
+        self.nogoods = {}                                           # (x, y, value) -> [nogood, ...]
+        self.nogood_count = 0
+
+    def explain(self, x, y):
+        depths = set()
+        for (_, cause) in self.reasons[x][y]:
+            depths |= cause
+        return depths
+
+    def prune(self, x, y, mask, depth, cause):
+        if self.csp.trail.remove(x, y, mask):
+            self.reasons[x][y].append((depth, cause))
+            self.touched[depth].append((x, y))
+
+    def forward_check(self, x, y, value, depth):
+        # Returns None, or the conflict set of the cell or cage that failed
+        csp = self.csp
+        value_bit = 1 << value
+        csp.trail.restrict(x, y, value_bit)
+        for (i, j) in csp.line_peers[x][y]:
+            if csp.grid[i][j] == 0 and csp.domains[i][j] & value_bit:
+                self.prune(i, j, value_bit, depth, {depth})
+                if not csp.domains[i][j]:
+                    return self.explain(i, j)
+
+        index = csp.cell_region[x][y]
+        if index < 0:
+            return None
+        cells = csp.regions[index].cells
+        cause = set()
+        for (i, j) in cells:
+            cause |= {self.depth_of[i][j]} if csp.grid[i][j] else self.explain(i, j)
+        cause.discard(-1)  # cells presolve assigned depend on no choice
+        changed = cage_gac.revise_cage(csp.domains, cells, csp.region_tuples[index], csp.trail)
+        if changed is None:
+            return cause
+        for (i, j) in changed:
+            self.reasons[i][j].append((depth, cause))
+            self.touched[depth].append((i, j))
+        return None
+
+    def nogood_conflict(self, x, y, value):
+        grid = self.csp.grid
+        for nogood in self.nogoods.get((x, y, value), ()):
+            if all(grid[i][j] == w for (i, j, w) in nogood if (i, j) != (x, y)):
+                return {self.depth_of[i][j] for (i, j, w) in nogood if (i, j) != (x, y)}
+        return None
+
+    def record_nogood(self, conflict):
+        # An empty conflict set means the puzzle has no solution at all; there
+        # is nothing to store
+        if not conflict or len(conflict) > self.max_size or self.nogood_count >= self.max_nogoods:
+            return
+        grid = self.csp.grid
+        nogood = tuple((i, j, grid[i][j]) for (i, j) in (self.assigned[d] for d in sorted(conflict)))
+        for literal in nogood:
+            self.nogoods.setdefault(literal, []).append(nogood)
+        self.nogood_count += 1
+        self.csp.stats.nogoods += 1
+
+    def undo(self, mark):
+        csp = self.csp
+        x, y = self.assigned.pop()
+        for (i, j) in self.touched.pop():
+            self.reasons[i][j].pop()
+        self.depth_of[x][y] = -1
+        csp.unassign(x, y)
+        csp.trail.undo(mark)
+
+    def search(self):
+        # Returns (True, None) when the grid is solved, else (False, conflict set)
+        csp = self.csp
+        cell = csp.select_unassigned_cell()
+        if cell is None:
+            return True, None
+        csp.stats.nodes += 1
+
+        depth = len(self.assigned)
+        x, y = cell
+        conflict = self.explain(x, y)
+        for value in csp.ordered_values(x, y):
+            failed = self.nogood_conflict(x, y, value)
+            if failed is not None:
+                conflict |= failed
+                continue
+
+            mark = csp.trail.mark()
+            csp.assign(x, y, value)
+            self.depth_of[x][y] = depth
+            self.assigned.append((x, y))
+            self.touched.append([])
+            failed = self.forward_check(x, y, value, depth)
+            if failed is None:
+                solved, failed = self.search()
+                if solved:
+                    return True, None
+                if depth not in failed:
+                    # This assignment played no part: jump over it
+                    csp.stats.backjumps += 1
+                    self.undo(mark)
+                    return False, failed
+                failed = failed - {depth}
+            else:
+                csp.stats.fc_failures += 1
+                failed.discard(depth)
+            conflict |= failed
+            csp.stats.backtracks += 1
+            self.undo(mark)
+
+        self.record_nogood(conflict)
+        return False, conflict
+
+
+def solve(csp, max_size=4, max_nogoods=10000):
+    if not csp.prepare_mac():
+        return False
+    solved, _ = BackjumpSearch(csp, max_size, max_nogoods).search()
+    return solved
@@ -0,0 +1,286 @@
+# A small conflict-driven clause learning SAT solver.
+#
+# Literals are non-zero ints as in DIMACS: v is variable v true, -v is it false.
+# The solver keeps two watched literals per clause, learns a first-UIP clause
+# from every conflict and jumps back to the second-highest level in it, picks
+# branch variables by VSIDS activity with saved phases, restarts on the Luby
+# sequence and halves the learnt clause database when it grows past a limit.
+#
+# Per-literal tables (watches) are lists of length 2 * num_vars + 1 indexed by
+# the literal itself: negative literals index from the end, so -v and v never
+# share a slot.
+
+import heapq
+
+UNASSIGNED = 0
+
+
+def luby(i):
+    # i-th term (from 1) of 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while (1 << k) - 1 != i:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class CDCLSolver:
+    def __init__(self, num_vars, restart_base=100, decay=0.95):
+        self.num_vars = num_vars
+        self.clauses = []
+        self.learnts = []
+        self.watches = [[] for _ in range(2 * num_vars + 1)]
+        self.assigns = [UNASSIGNED] * (num_vars + 1)   # 1 true, -1 false
+        self.level = [0] * (num_vars + 1)
+        self.reason = [None] * (num_vars + 1)
+        self.phase = [False] * (num_vars + 1)
+        self.activity = [0.0] * (num_vars + 1)
+        self.var_inc = 1.0
+        self.decay = decay
+        self.heap = [(0.0, v) for v in range(1, num_vars + 1)]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.restart_base = restart_base
+        self.max_learnts = 2000
+        self.ok = True
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+
+    # Clauses
+
+    def add_clause(self, literals):
+        # Returns False once the formula is known to be unsatisfiable. Must be
+        # called before solve, at decision level 0.
+        if not self.ok:
+            return False
+        clause = []
+        for lit in dict.fromkeys(literals):
+            value = self.value(lit)
+            if value == 1 or -lit in clause:
+                return True  # satisfied or a tautology
+            if value == UNASSIGNED:
+                clause.append(lit)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(clause)
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def value(self, lit):
+        value = self.assigns[abs(lit)]
+        return value if lit > 0 else -value
+
+    # Assignment and propagation
+
+    def enqueue(self, lit, reason):
+        var = abs(lit)
+        self.assigns[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        # Unit propagation over the watch lists; returns a conflicting clause or None
+        assigns, watches, trail = self.assigns, self.watches, self.trail
+        while self.qhead < len(trail):
+            false_lit = -trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            watching = watches[false_lit]
+            kept = []
+            i = 0
+            count = len(watching)
+            while i < count:
+                clause = watching[i]
+                i += 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                first_value = assigns[first] if first > 0 else -assigns[-first]
+                if first_value == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if (assigns[lit] if lit > 0 else -assigns[-lit]) != -1:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value == -1:
+                        kept.extend(watching[i:])
+                        watches[false_lit] = kept
+                        self.qhead = len(trail)
+                        return clause
+                    self.enqueue(first, clause)
+            watches[false_lit] = kept
+        return None
+
+    def cancel_until(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.assigns[var] = UNASSIGNED
+            self.reason[var] = None
+            self.phase[var] = lit > 0
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    # Conflict analysis
+
+    def analyze(self, conflict):
+        # First-UIP learning: returns (learnt clause with the asserting literal
+        # first and the highest other level second, backjump level)
+        seen = set()
+        learnt = [0]
+        current = len(self.trail_lim)
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        lit = None
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                var = abs(q)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.level[var] == current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            clause = self.reason[abs(lit)]
+            pending -= 1
+            if pending == 0:
+                break
+        learnt[0] = -lit
+
+        if len(learnt) == 1:
+            return learnt, 0
+        best = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def bump(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)
+                         if self.assigns[v] == UNASSIGNED]
+            heapq.heapify(self.heap)
+        elif self.assigns[var] == UNASSIGNED:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    # Search
+
+    def pick_branch(self):
+        # Unassigned variable of highest activity; heap entries for assigned
+        # variables or out-of-date activities are skipped
+        heap = self.heap
+        while heap:
+            negative, var = heapq.heappop(heap)
+            if self.assigns[var] == UNASSIGNED and -negative == self.activity[var]:
+                return var
+        for var in range(1, self.num_vars + 1):
+            if self.assigns[var] == UNASSIGNED:
+                return var
+        return None
+
+    def reduce_db(self):
+        # At level 0: keep the shorter half of the learnt clauses, drop satisfied
+        # clauses and false literals, and rebuild every watch list
+        self.learnts.sort(key=len)
+        self.learnts = self.learnts[:len(self.learnts) // 2]
+        self.watches = [[] for _ in range(2 * self.num_vars + 1)]
+        for clauses in (self.clauses, self.learnts):
+            kept = []
+            for clause in clauses:
+                if any(self.value(lit) == 1 for lit in clause):
+                    continue
+                clause = [lit for lit in clause if self.value(lit) == UNASSIGNED]
+                if not clause:
+                    return False
+                if len(clause) == 1:
+                    self.enqueue(clause[0], None)
+                    continue
+                kept.append(clause)
+                self.watch(clause)
+            clauses[:] = kept
+        return self.propagate() is None
+
+    def solve(self, max_conflicts=None):
+        # True (model in self.assigns), False (unsatisfiable) or None when
+        # max_conflicts ran out
+        if not self.ok or self.propagate() is not None:
+            self.ok = False
+            return False
+        restart = 1
+        budget = self.restart_base * luby(restart)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                budget -= 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self.watch(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.var_inc /= self.decay
+                if max_conflicts is not None and self.conflicts >= max_conflicts:
+                    self.cancel_until(0)
+                    return None
+                continue
+
+            if budget <= 0:
+                self.restarts += 1
+                restart += 1
+                budget = self.restart_base * luby(restart)
+                self.cancel_until(0)
+                if len(self.learnts) > self.max_learnts:
+                    self.max_learnts = self.max_learnts * 11 // 10
+                    if not self.reduce_db():
+                        self.ok = False
+                        return False
+                continue
+
+            var = self.pick_branch()
+            if var is None:
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(var if self.phase[var] else -var, None)
+
+    def model(self):
+        # Variables true in the last satisfying assignment
+        return [var for var in range(1, self.num_vars + 1) if self.assigns[var] == 1]
@@ -0,0 +1,159 @@
+# KenKen as exact cover, solved with Algorithm X on dancing links.
+#
+# Columns (all must be covered exactly once):
+#   cell (x, y) filled       x * N + y
+#   row x has value v        N*N + x * N + v - 1
+#   column y has value v     2*N*N + y * N + v - 1
+#   cage k filled            3*N*N + k
+# Rows are the valid tuples of each cage (Puzzle.region_tuples); a tuple covers
+# its cells, the row and column values it places, and its cage.
+#
+# The links are kept in parallel int lists (left, right, up, down, column)
+# rather than node objects; node 0 is the root and nodes 1..columns are the
+# column headers.
+
+
+class ExactCover:
+    def __init__(self, n_columns):
+        headers = range(n_columns + 1)
+        self.left = [i - 1 for i in headers]
+        self.left[0] = n_columns
+        self.right = [i + 1 for i in headers]
+        self.right[n_columns] = 0
+        self.up = list(headers)
+        self.down = list(headers)
+        self.column = list(headers)
+        self.size = [0] * (n_columns + 1)
+        self.row_of = [-1] * (n_columns + 1)
+        self.nodes = 0
+        self.backtracks = 0
+
+    def add_row(self, row_id, columns):
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = None
+        for c in columns:
+            header = c + 1
+            node = len(self.column)
+            self.column.append(header)
+            self.row_of.append(row_id)
+            up.append(up[header])
+            down.append(header)
+            down[up[header]] = node
+            up[header] = node
+            self.size[header] += 1
+            if first is None:
+                left.append(node)
+                right.append(node)
+                first = node
+            else:
+                left.append(left[first])
+                right.append(first)
+                right[left[first]] = node
+                left[first] = node
+
+    def cover(self, c):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, c):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+
+    def search(self, chosen=None):
+        # Yields every exact cover as a list of row ids
+        if chosen is None:
+            chosen = []
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            yield list(chosen)
+            return
+        self.nodes += 1
+
+        # The column with the fewest rows left
+        c = right[0]
+        best = c
+        while c != 0:
+            if size[c] < size[best]:
+                best = c
+                if size[c] <= 1:
+                    break
+            c = right[c]
+        if size[best] == 0:
+            return
+
+        self.cover(best)
+        r = down[best]
+        while r != best:
+            chosen.append(self.row_of[r])
+            j = right[r]
+            while j != r:
+                self.cover(self.column[j])
+                j = right[j]
+            yield from self.search(chosen)
+            j = self.left[r]
+            while j != r:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            chosen.pop()
+            self.backtracks += 1
+            r = down[r]
+        self.uncover(best)
+
+
+def kenken_cover(model):
+    # Returns (ExactCover, rows) where rows[row_id] = (cage index, tuple)
+    n = model.grid_size
+    cover = ExactCover(3 * n * n + len(model.regions))
+    rows = []
+    for index, (cells, tuples) in enumerate(zip(model.region_cells, model.region_tuples)):
+        for values in tuples:
+            columns = []
+            for (x, y), v in zip(cells, values):
+                columns.append(x * n + y)
+                columns.append(n * n + x * n + v - 1)
+                columns.append(2 * n * n + y * n + v - 1)
+            columns.append(3 * n * n + index)
+            cover.add_row(len(rows), columns)
+            rows.append((index, values))
+    return cover, rows
+
+
+def cover_to_grid(model, rows, chosen):
+    n = model.grid_size
+    grid = [[0] * n for _ in range(n)]
+    for row_id in chosen:
+        index, values = rows[row_id]
+        for (x, y), v in zip(model.region_cells[index], values):
+            grid[x][y] = v
+    return grid
+
+
+def solutions(model):
+    # Every solution grid, lazily
+    cover, rows = kenken_cover(model)
+    for chosen in cover.search():
+        yield cover_to_grid(model, rows, chosen)
+
+
+def solve(model):
+    return next(solutions(model), None)
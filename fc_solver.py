@@ -0,0 +1,71 @@
+import random
+
+import bitdomain
+import puzzle
+import search_stats
+
+def kenken_solver(grid_size, regions=None, value_order='ascending', seed=None, stats=None):
+    # Returns the solved grid or None. stats=True returns (grid, SearchStats)
+    # instead; a SearchStats passed as stats has the run's counts added to it
+    model = puzzle.as_puzzle(grid_size, regions)
+    counts = search_stats.make_stats(stats)
+    rng = random.Random(seed)
+    grid_size = model.grid_size
+
+    def is_valid_assignment(solution):
+        return model.check_solution(solution)
+
+    def forward_check(solution, row, col):
+        # Remove values already in the row and column
+        remaining = bitdomain.full_domain(grid_size) & ~(row_used[row] | col_used[col])
+        remaining_values = list(bitdomain.ordered_values(remaining, value_order, rng))
+
+        index = model.cell_region[row][col]
+        if index >= 0:
+            remaining_values = [
+                val for val in remaining_values
+                if is_valid_partial_region(solution, index, row, col, val)
+            ]
+
+        return remaining_values
+
+    def is_valid_partial_region(solution, index, row, col, new_val):
+        # Whether the cage, with new_val in (row, col), can still reach its target
+        solution[row][col] = new_val
+        valid = model.check_region(index, solution)
+        solution[row][col] = 0
+        return valid
+
+    def backtrack(solution, row, col):
+        if row == grid_size:
+            return solution if is_valid_assignment(solution) else None
+
+        next_row, next_col = (row, col + 1) if col < grid_size - 1 else (row + 1, 0)
+
+        counts.nodes += 1
+        possible_values = forward_check(solution, row, col)
+        if not possible_values:
+            counts.fc_failures += 1
+
+        for val in possible_values:
+            solution[row][col] = val
+            row_used[row] |= 1 << val
+            col_used[col] |= 1 << val
+
+            result = backtrack(solution, next_row, next_col)
+            if result:
+                return result
+
+            counts.backtracks += 1
+            solution[row][col] = 0
+            row_used[row] &= ~(1 << val)
+            col_used[col] &= ~(1 << val)
+
+        return None
+
+    initial_solution = [[0 for _ in range(grid_size)] for _ in range(grid_size)]
+    row_used = [0] * grid_size
+    col_used = [0] * grid_size
+
+    solution = backtrack(initial_solution, 0, 0)
+    return (solution, counts) if stats is True else solution
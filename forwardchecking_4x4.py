@@ -1,13 +1,15 @@
 import time
 
-class forwardchecking_4x4:
+import bitdomain
+import puzzle
+
+class forwardchecking_4x4(puzzle.GridSolver):
     N = 4
     
-    def __init__(self):
-        self.grid = [[0] * self.N for _ in range(self.N)]
-        self.domains = [[set(range(1, self.N + 1)) for _ in range(self.N)] for _ in range(self.N)]
-        self.forward_checking_time = 0  # Variable to store forward checking time
-        self.regions = self.initialize_regions()
+    def __init__(self, model=None, stats=True):
+        super().__init__(model if model is not None else puzzle.Puzzle(self.N, self.initialize_regions()), stats=stats)
+        self.N = self.grid_size
+        self.solve_time = 0
 
     def initialize_regions(self):
         return [
@@ -21,10 +23,10 @@ class forwardchecking_4x4:
         ]
     
     def solve(self):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = self.backtrack_with_forward_checking()
-        solve_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-        return result, solve_time
+        self.solve_time = (time.perf_counter() - start_time) * 1000  # Convert to milliseconds
+        return result, self.solve_time
 
     def backtrack_with_forward_checking(self):
         if self.is_grid_complete():
@@ -33,22 +35,18 @@ class forwardchecking_4x4:
         row, col = self.find_unassigned_cell()
         if row is None:
             return False
+        self.stats.nodes += 1
         
-        for value in sorted(self.domains[row][col]):
+        for value in bitdomain.values(self.domains[row][col]):
             if self.is_valid_assignment(row, col, value):
-                self.grid[row][col] = value
-                domain_backup = self.create_domain_backup()
-                
-                # Measure forward checking time
-                forward_start = time.time()
-                if self.forward_check(row, col):
-                    forward_checking_duration = (time.time() - forward_start) * 1000  # Convert to milliseconds
-                    self.forward_checking_time += forward_checking_duration
-                    if self.backtrack_with_forward_checking():
-                        return True
+                mark = self.trail.mark()
+                self.assign(row, col, value)
+                if self.forward_check(row, col, value) and self.backtrack_with_forward_checking():
+                    return True
+                self.stats.backtracks += 1
                 
-                self.grid[row][col] = 0
-                self.restore_domains(domain_backup)
+                self.unassign(row, col)
+                self.trail.undo(mark)
         
         return False
 
@@ -59,74 +57,30 @@ class forwardchecking_4x4:
                     return row, col
         return None, None
 
-    def forward_check(self, row, col):
-        value = self.grid[row][col]
-        for i in range(self.N):
-            if i != col and self.grid[row][i] == 0:
-                self.domains[row][i].discard(value)
-                if not self.domains[row][i]:
-                    return False
-            if i != row and self.grid[i][col] == 0:
-                self.domains[i][col].discard(value)
-                if not self.domains[i][col]:
-                    return False
-        return self.validate_region_constraints_after_assignment(row, col)
+    def forward_check(self, row, col, value):
+        # Only the row/column pruning of the shared forward check, then the
+        # assigned cell's cage against its target
+        return self.prune_line_peers(row, col, value) and self.validate_region_constraints_after_assignment(row, col)
 
     def validate_region_constraints_after_assignment(self, row, col):
-        for cage in self.regions:
-            if (row, col) in cage['cells']:
-                if not self.can_satisfy_region_constraint(cage):
-                    return False
-        return True
-
-    def can_satisfy_region_constraint(self, cage):
-        assigned_values = [self.grid[r][c] for r, c in cage['cells'] if self.grid[r][c] != 0]
-        unassigned_cells = [cell for cell in cage['cells'] if self.grid[cell[0]][cell[1]] == 0]
-        
-        if not unassigned_cells:
-            return self.check_region_constraint(assigned_values, cage['operation'], cage['target'])
+        index = self.cell_region[row][col]
+        if index >= 0 and not self.puzzle.check_region(index, self.grid):
+            return False
         return True
-
-    def check_region_constraint(self, values, operation, target):
-        if operation == '+':
-            return sum(values) == target
-        elif operation == '*':
-            result = 1
-            for v in values:
-                result *= v
-            return result == target
-        elif operation == '-':
-            return abs(values[0] - values[1]) == target
-        elif operation == '/':
-            return max(values) / min(values) == target
-        return False
-    
-    def is_valid_assignment(self, row, col, value):
-        return all(self.grid[row][i] != value for i in range(self.N)) and \
-               all(self.grid[i][col] != value for i in range(self.N))
     
     def validate_regions(self):
-        for region in self.regions:
-            values = [self.grid[r][c] for r, c in region['cells']]
-            if not self.check_region_constraint(values, region['operation'], region['target']):
+        for index, region in enumerate(self.regions):
+            values = [self.grid[r][c] for r, c in region.cells]
+            if not self.puzzle.checkers[index](values):
                 return False
         return True
     
-    def create_domain_backup(self):
-        return [[set(col) for col in row] for row in self.domains]
-    
-    def restore_domains(self, backup):
-        self.domains = [[set(col) for col in row] for row in backup]
-    
     def is_grid_complete(self):
         return all(all(cell != 0 for cell in row) for row in self.grid)
     
-    def print_grid(self):
-        for row in self.grid:
-            print(row)
-    
     def print_performance_metrics(self):
-        print(f"Forward Checking Time: {self.forward_checking_time:.6f} ms")
+        print(f"Solve Time: {self.solve_time:.6f} ms")
+        print(f"Search stats: {self.stats.as_dict()}")
 
 if __name__ == "__main__":
     solver = forwardchecking_4x4()
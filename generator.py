@@ -0,0 +1,202 @@
+# Generate puzzles with exactly one solution and write them as a puzzle file:
+#
+#   python generator.py --size 6 --count 100 --output corpus6.txt
+#   python generator.py --size 9 --count 1000 --workers 8 --seed 1 --output corpus9.txt
+#
+# A puzzle starts as a random Latin square with every cell its own cage, which
+# has one solution. Adjacent cages are then merged one pair at a time, with an
+# operation and target taken from the square, and a merge is kept only when
+# the puzzle stays unique. Only the merged cage changes, and the puzzle before
+# the merge had one solution, so any new solution must fill the merged cage
+# with a tuple that breaks one of the two old cages. The merge is accepted at
+# once when no such tuple exists; otherwise MAC looks for a solution with the
+# merged cage narrowed to those tuples. That search gets a node budget, and a
+# merge whose proof runs over it is rejected, which keeps every puzzle unique
+# while bounding the time spent on one candidate.
+
+import argparse
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import ac3_solver
+import cage_gac
+import puzzle
+import puzzle_io
+import stack_search
+
+
+def latin_square(n, rng):
+    # The cyclic square with its rows, columns and symbols shuffled
+    rows = rng.sample(range(n), n)
+    cols = rng.sample(range(n), n)
+    symbols = rng.sample(range(1, n + 1), n)
+    return [[symbols[(r + c) % n] for c in cols] for r in rows]
+
+
+def choose_operation(values, rng):
+    if len(values) == 1:
+        return ' ', values[0]
+    options = [('+', sum(values)), ('*', math.prod(values))]
+    if len(values) == 2:
+        high, low = max(values), min(values)
+        options.append(('-', high - low))
+        if high % low == 0:
+            options.append(('/', high // low))
+    return rng.choice(options)
+
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+
+def find_solution(csp, budget):
+    # The MAC search with a node budget: True if the puzzle has a solution,
+    # False if not, SearchBudgetExceeded when the budget runs out first
+    found = stack_search.StackSearch(csp).run(max_nodes=budget)
+    if found is None:
+        raise SearchBudgetExceeded()
+    return found
+
+
+class Generator:
+    def __init__(self, n, seed=None, max_cage=4, budget=500):
+        if n < 1:
+            raise ValueError(f"grid size must be positive, got {n}")
+        self.n = n
+        self.rng = random.Random(seed)
+        self.max_cage = max_cage
+        self.budget = budget
+        self.solution = latin_square(n, self.rng)
+        # cage id -> (cells, operation, target, tuples); every cell starts alone
+        self.cages = {}
+        self.cage_of = [[0] * n for _ in range(n)]
+        for x in range(n):
+            for y in range(n):
+                self._add_cage(x * n + y, [(x, y)], ' ', self.solution[x][y])
+        self.next_id = n * n
+        self.searches = 0
+        self.rejected = 0
+        self.over_budget = 0
+
+    def _add_cage(self, cage_id, cells, operation, target, tuples=None):
+        if tuples is None:
+            tuples = cage_gac.cage_tuples(cells, operation, target, self.n)
+        self.cages[cage_id] = (cells, operation, target, tuples)
+        for (x, y) in cells:
+            self.cage_of[x][y] = cage_id
+
+    def neighbours(self, x, y):
+        for (i, j) in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= i < self.n and 0 <= j < self.n:
+                yield i, j
+
+    def try_merge(self, a, b):
+        cells_a, op_a, target_a, _ = self.cages[a]
+        cells_b, op_b, target_b, _ = self.cages[b]
+        cells = cells_a + cells_b
+        values = [self.solution[x][y] for (x, y) in cells]
+        operation, target = choose_operation(values, self.rng)
+        tuples = cage_gac.cage_tuples(cells, operation, target, self.n)
+
+        # Fillings that satisfy both old cages were already ruled out by uniqueness
+        check_a = cage_gac.make_checker(op_a, target_a)
+        check_b = cage_gac.make_checker(op_b, target_b)
+        split = len(cells_a)
+        new = [t for t in tuples if not (check_a(t[:split]) and check_b(t[split:]))]
+        if new and self.has_other_solution(a, b, cells, operation, target, new):
+            self.rejected += 1
+            return False
+
+        del self.cages[a], self.cages[b]
+        self._add_cage(self.next_id, cells, operation, target, tuples)
+        self.next_id += 1
+        return True
+
+    def has_other_solution(self, a, b, cells, operation, target, narrowed):
+        self.searches += 1
+        regions, tuples = [], []
+        for cage_id, (cage_cells, cage_op, cage_target, cage_tuples) in self.cages.items():
+            if cage_id not in (a, b):
+                regions.append(puzzle.region(cage_cells, cage_op, cage_target))
+                tuples.append(cage_tuples)
+        regions.append(puzzle.region(cells, operation, target))
+        tuples.append(narrowed)
+        csp = ac3_solver.CSP(puzzle.Puzzle(self.n, regions, tuples))
+        try:
+            return csp.prepare_mac() and find_solution(csp, self.budget)
+        except SearchBudgetExceeded:
+            self.over_budget += 1
+            return True
+
+    def run(self, attempts=None):
+        attempts = attempts if attempts is not None else 3 * self.n * self.n
+        if self.n == 1:
+            return self.model()  # the single cell has no neighbour to merge with
+        cells = [(x, y) for x in range(self.n) for y in range(self.n)]
+        for _ in range(attempts):
+            x, y = self.rng.choice(cells)
+            i, j = self.rng.choice(list(self.neighbours(x, y)))
+            a, b = self.cage_of[x][y], self.cage_of[i][j]
+            if a != b and len(self.cages[a][0]) + len(self.cages[b][0]) <= self.max_cage:
+                self.try_merge(a, b)
+        return self.model()
+
+    def model(self):
+        regions = [puzzle.region(cells, operation, target)
+                   for (cells, operation, target, _) in self.cages.values()]
+        return puzzle_io.load(self.n, regions)
+
+
+def generate(n, seed=None, max_cage=4, attempts=None, budget=500):
+    # A compiled Puzzle with exactly one solution
+    return Generator(n, seed, max_cage, budget).run(attempts)
+
+
+def _generate_line(n, seed, max_cage, attempts, budget):
+    return puzzle_io.encode(generate(n, seed, max_cage, attempts, budget), f"gen{n}-{seed}")
+
+
+def generate_lines(n, count, seed=0, max_cage=4, attempts=None, budget=500, workers=1):
+    # Puzzle lines for seeds seed, seed + 1, ..., in order
+    seeds = range(seed, seed + count)
+    if workers == 1:
+        for s in seeds:
+            yield _generate_line(n, s, max_cage, attempts, budget)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_generate_line, [n] * count, seeds, [max_cage] * count, [attempts] * count,
+                                [budget] * count, chunksize=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate puzzles with a unique solution")
+    parser.add_argument("--size", type=int, default=6)
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first puzzle; each puzzle uses the next")
+    parser.add_argument("--max-cage", type=int, default=4, help="largest cage size")
+    parser.add_argument("--attempts", type=int, help="merge attempts per puzzle (default: 3 * N * N)")
+    parser.add_argument("--budget", type=int, default=500,
+                        help="search nodes allowed to prove a merge keeps the puzzle unique")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, 0 for one per CPU")
+    parser.add_argument("--output", help="write the puzzles here instead of stdout")
+    args = parser.parse_args(argv)
+    if args.size < 1:
+        parser.error(f"--size must be at least 1, got {args.size}")
+
+    workers = args.workers or os.cpu_count() or 1
+    lines = generate_lines(args.size, args.count, args.seed, args.max_cage, args.attempts, args.budget, workers)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for line in lines:
+            output.write(line + '\n')
+            output.flush()
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# KenKen as CNF, for the CDCL solver in cdcl.py or any external SAT solver:
+#
+#   python kenken_cnf.py puzzles/instances.txt --dimacs out/    # one .cnf per puzzle
+#
+# Variable (x * N + y) * N + v is "cell (x, y) holds v", for 1..N**3. Clauses:
+#   every cell holds a value, and at most one (pairwise)
+#   every row and column holds each value, and at most once (pairwise)
+#   every cage takes one of its valid tuples: one selector variable per tuple,
+#   at least one selector is true and a true selector fixes the cage's cells;
+#   a value no tuple uses in a cell is ruled out by a unit clause
+
+import argparse
+import os
+
+import cdcl
+import puzzle_io
+
+
+def variable(n, x, y, v):
+    return (x * n + y) * n + v
+
+
+def encode(model):
+    # Returns (number of variables, list of clauses)
+    n = model.grid_size
+    clauses = []
+
+    for x in range(n):
+        for y in range(n):
+            cell = [variable(n, x, y, v) for v in range(1, n + 1)]
+            clauses.append(cell)
+            clauses.extend([-a, -b] for k, a in enumerate(cell) for b in cell[k + 1:])
+
+    for v in range(1, n + 1):
+        for i in range(n):
+            for line in ([variable(n, i, j, v) for j in range(n)], [variable(n, j, i, v) for j in range(n)]):
+                clauses.append(line)
+                clauses.extend([-a, -b] for k, a in enumerate(line) for b in line[k + 1:])
+
+    num_vars = n ** 3
+    for cells, tuples in zip(model.region_cells, model.region_tuples):
+        selectors = []
+        supported = [set() for _ in cells]
+        for values in tuples:
+            num_vars += 1
+            selectors.append(num_vars)
+            for k, ((x, y), v) in enumerate(zip(cells, values)):
+                clauses.append([-num_vars, variable(n, x, y, v)])
+                supported[k].add(v)
+        clauses.append(selectors)
+        for k, (x, y) in enumerate(cells):
+            clauses.extend([-variable(n, x, y, v)] for v in range(1, n + 1) if v not in supported[k])
+    return num_vars, clauses
+
+
+def write_dimacs(path, model, name=None):
+    num_vars, clauses = encode(model)
+    with open(path, 'w') as f:
+        if name is not None:
+            f.write(f"c {name}\n")
+        f.write(f"c variable (x * {model.grid_size} + y) * {model.grid_size} + v: cell (x, y) holds v\n")
+        f.write(f"p cnf {num_vars} {len(clauses)}\n")
+        for clause in clauses:
+            f.write(' '.join(map(str, clause)) + ' 0\n')
+
+
+def decode(model, true_vars):
+    n = model.grid_size
+    grid = [[0] * n for _ in range(n)]
+    for var in true_vars:
+        if var <= n ** 3:
+            cell, v = divmod(var - 1, n)
+            grid[cell // n][cell % n] = v + 1
+    return grid
+
+
+def solve(model, max_conflicts=None):
+    # Returns (grid or None, solver); the grid is None when the puzzle has no
+    # solution or max_conflicts ran out first (solver.ok tells them apart)
+    num_vars, clauses = encode(model)
+    solver = cdcl.CDCLSolver(num_vars)
+    for clause in clauses:
+        if not solver.add_clause(clause):
+            return None, solver
+    if solver.solve(max_conflicts):
+        return decode(model, solver.model()), solver
+    return None, solver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write each puzzle of a puzzle file as a DIMACS CNF file")
+    parser.add_argument("path")
+    parser.add_argument("--dimacs", required=True, help="directory for the <name>.cnf files")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dimacs, exist_ok=True)
+    for name, model in puzzle_io.read_file(args.path):
+        write_dimacs(os.path.join(args.dimacs, f"{name}.cnf"), model, name)
+
+
+if __name__ == "__main__":
+    main()
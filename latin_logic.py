@@ -0,0 +1,79 @@
+# Latin-square deductions on bitmask domains, run by CSP.presolve between AC-3
+# passes before any search:
+#
+#   hidden single: a value that only one cell of a row or column can still
+#   take goes in that cell
+#   naked subset:  k cells of a row or column (k = 2 or 3) whose domains hold
+#   only k values between them take those values, so the line's other cells
+#   cannot
+#
+# Every function returns the cells whose domain shrank, or None when a row or
+# column is left with a value no cell can take (or an empty domain). With a
+# trail the removals are recorded so that they can be undone.
+from itertools import combinations
+
+import bitdomain
+
+
+def lines(grid_size):
+    rows = [[(x, y) for y in range(grid_size)] for x in range(grid_size)]
+    cols = [[(x, y) for x in range(grid_size)] for y in range(grid_size)]
+    return rows + cols
+
+
+def restrict(domains, x, y, keep, trail):
+    if trail is not None:
+        trail.restrict(x, y, keep)
+    else:
+        domains[x][y] &= keep
+
+
+def hidden_singles(domains, line, grid_size, trail=None):
+    changed = []
+    for value in range(1, grid_size + 1):
+        value_bit = 1 << value
+        places = [(x, y) for (x, y) in line if domains[x][y] & value_bit]
+        if not places:
+            return None
+        if len(places) == 1:
+            x, y = places[0]
+            if domains[x][y] != value_bit:
+                restrict(domains, x, y, value_bit, trail)
+                changed.append((x, y))
+    return changed
+
+
+def naked_subsets(domains, line, max_size=3, trail=None):
+    changed = []
+    for k in range(2, max_size + 1):
+        candidates = [(x, y) for (x, y) in line if 2 <= bitdomain.size(domains[x][y]) <= k]
+        for subset in combinations(candidates, k):
+            union = 0
+            for (x, y) in subset:
+                union |= domains[x][y]
+            if bitdomain.size(union) != k:
+                continue
+            for (x, y) in line:
+                if (x, y) not in subset and domains[x][y] & union:
+                    restrict(domains, x, y, ~union, trail)
+                    if not domains[x][y]:
+                        return None
+                    if (x, y) not in changed:
+                        changed.append((x, y))
+    return changed
+
+
+def revise_lines(domains, grid_size, max_size=3, trail=None):
+    # One pass of both rules over every row and column
+    changed = []
+    for line in lines(grid_size):
+        shrunk = hidden_singles(domains, line, grid_size, trail)
+        if shrunk is not None:
+            more = naked_subsets(domains, line, max_size, trail)
+            shrunk = None if more is None else shrunk + more
+        if shrunk is None:
+            return None
+        for cell in shrunk:
+            if cell not in changed:
+                changed.append(cell)
+    return changed
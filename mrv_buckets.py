@@ -0,0 +1,69 @@
+import bitdomain
+
+
+class DomainBuckets:
+    # Unassigned cells grouped by current domain size, so the MRV cell is found by
+    # walking at most N + 1 buckets instead of rescanning the grid. resize() must
+    # be called whenever a domain changes (Trail.on_change), remove()/restore()
+    # when a cell is assigned/unassigned. Ties go to the first cell in row-major
+    # order, or with tie_break to the cell with the most unassigned peers (degree).
+    #
+    # Each bucket is a bitmask over cell ids x * N + y, so moving a cell is two
+    # bit operations and the row-major first cell of a bucket is its lowest set
+    # bit. Degree ties still walk the smallest bucket, since degrees change.
+    def __init__(self, domains, peers, tie_break=False):
+        n = len(domains)
+        self.n = n
+        self.domains = domains
+        self.peers = peers
+        self.tie_break = tie_break
+        self.size = [[bitdomain.size(domains[x][y]) for y in range(n)] for x in range(n)]
+        self.active = [[True] * n for _ in range(n)]
+        self.degree = [[len(peers[x][y]) for y in range(n)] for x in range(n)]
+        self.buckets = [0] * (n + 1)
+        for x in range(n):
+            for y in range(n):
+                self.buckets[self.size[x][y]] |= 1 << (x * n + y)
+
+    def resize(self, x, y):
+        if not self.active[x][y]:
+            return
+        new_size = bitdomain.size(self.domains[x][y])
+        old_size = self.size[x][y]
+        if new_size != old_size:
+            cell_bit = 1 << (x * self.n + y)
+            self.buckets[old_size] &= ~cell_bit
+            self.buckets[new_size] |= cell_bit
+            self.size[x][y] = new_size
+
+    def remove(self, x, y):
+        self.active[x][y] = False
+        self.buckets[self.size[x][y]] &= ~(1 << (x * self.n + y))
+        for (i, j) in self.peers[x][y]:
+            self.degree[i][j] -= 1
+
+    def restore(self, x, y):
+        for (i, j) in self.peers[x][y]:
+            self.degree[i][j] += 1
+        self.active[x][y] = True
+        self.size[x][y] = bitdomain.size(self.domains[x][y])
+        self.buckets[self.size[x][y]] |= 1 << (x * self.n + y)
+
+    def select(self):
+        for bucket in self.buckets:
+            if bucket:
+                if self.tie_break:
+                    return self.most_constraining(bucket)
+                return divmod((bucket & -bucket).bit_length() - 1, self.n)
+        return None
+
+    def most_constraining(self, bucket):
+        # Highest degree in the bucket, the row-major first on equal degree
+        best, best_degree = None, -1
+        while bucket:
+            low = bucket & -bucket
+            x, y = divmod(low.bit_length() - 1, self.n)
+            if self.degree[x][y] > best_degree:
+                best, best_degree = (x, y), self.degree[x][y]
+            bucket ^= low
+        return best
@@ -0,0 +1,38 @@
+import mrv_buckets
+import puzzle
+
+class MRV_6x6(puzzle.GridSolver):
+    def __init__(self, grid_size, regions=None, value_order='ascending', seed=None, stats=True, tie_break=False):
+        # tie_break: break MRV ties by degree (most unassigned peers) instead of row-major order
+        super().__init__(grid_size, regions, value_order, seed, stats)
+        self._initial_constraints()
+        self.buckets = mrv_buckets.DomainBuckets(self.domains, self.peers, tie_break)
+        self.trail.on_change = self.buckets.resize
+
+    def solve(self, cache=None):
+        if cache is not None:
+            return cache.solve_with(self, self.backtrack)
+        return self.backtrack()
+
+    def backtrack(self):
+        # Find the next cell to assign using MRV
+        cell = self.select_unassigned_cell()
+        if cell is None:
+            return True
+        self.stats.nodes += 1
+
+        x, y = cell
+        for value in self.ordered_values(x, y):
+            if self.is_consistent(x, y, value):
+                mark = self.trail.mark()
+                self.assign(x, y, value)
+                if self.forward_check(x, y, value) and self.backtrack():
+                    return True
+                self.stats.backtracks += 1
+                self.unassign(x, y)
+                self.trail.undo(mark)
+        return False
+
+    def select_unassigned_cell(self):
+        # MRV heuristic: select the cell with the smallest domain
+        return self.buckets.select()
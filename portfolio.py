@@ -0,0 +1,140 @@
+# Race several strategy / value-order combinations on the same puzzle, each in
+# its own process, and keep whichever finishes first:
+#
+#   python portfolio.py puzzles/instances.txt
+#   python portfolio.py corpus.txt --entry mac --entry mac:descending --entry fc:random:7 --timeout 10
+#
+# An entry is <strategy>[:<value order>[:<seed>]]. Every solver is complete, so
+# the first process to report has the answer (a grid, or proof that there is
+# none) and the others are terminated. Puzzles reach the workers in their
+# compact text form.
+
+import argparse
+import json
+import multiprocessing
+import queue
+import sys
+import time
+
+import bitdomain
+import puzzle_io
+from batch import puzzle_lines
+from strategies import STRATEGIES
+
+DEFAULT_ENTRIES = [
+    ('mac', 'ascending', None),
+    ('mac', 'descending', None),
+    ('mac', 'random', 1),
+    ('dlx', 'ascending', None),
+    ('mrv', 'ascending', None),
+    ('ac3', 'ascending', None),
+    ('fc', 'ascending', None),
+]
+POLL_SECONDS = 0.1  # how often race looks for entry processes that died without reporting
+
+
+def parse_entry(text):
+    strategy, _, rest = text.partition(':')
+    order, _, seed = rest.partition(':')
+    order = order or 'ascending'
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}")
+    if order not in bitdomain.VALUE_ORDERS:
+        raise ValueError(f"unknown value order {order!r}")
+    return strategy, order, int(seed) if seed else None
+
+
+def _run_entry(index, entry, line, results):
+    strategy, order, seed = entry
+    try:
+        _, model = puzzle_io.parse_line(line)
+        grid = STRATEGIES[strategy](model, order, seed)
+    except Exception as error:
+        results.put((index, None, repr(error)))
+    else:
+        results.put((index, grid, None))
+
+
+def race(model, entries=DEFAULT_ENTRIES, timeout=None):
+    # Returns {"strategy", "value_order", "seed", "solved", "grid", "ms"} for the
+    # winning entry, or None when no entry finished within timeout seconds.
+    # model may be a Puzzle or an already encoded puzzle line.
+    line = model if isinstance(model, str) else puzzle_io.encode(model)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_run_entry, args=(index, entry, line, results), daemon=True)
+                 for index, entry in enumerate(entries)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    errors = []
+    pending = set(range(len(processes)))
+    try:
+        while pending:
+            remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                index, grid, error = results.get(timeout=POLL_SECONDS if remaining is None
+                                                 else min(remaining, POLL_SECONDS))
+            except queue.Empty:
+                # An entry whose process is gone without reporting (killed by a
+                # signal, os._exit, a BaseException) has failed. The dead are
+                # noted before the queue is checked once more: whatever they did
+                # put is in the pipe by the time they have exited.
+                dead = [index for index in pending if processes[index].exitcode is not None]
+                try:
+                    index, grid, error = results.get_nowait()
+                except queue.Empty:
+                    for index in dead:
+                        pending.discard(index)
+                        errors.append(f"{entries[index][0]} process exited with code {processes[index].exitcode}")
+                    continue
+            pending.discard(index)
+            if error is not None:
+                errors.append(error)
+                continue
+            strategy, order, seed = entries[index]
+            elapsed = (time.perf_counter() - start) * 1000
+            return {"strategy": strategy, "value_order": order, "seed": seed,
+                    "solved": grid is not None, "grid": grid, "ms": round(elapsed, 3)}
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        results.close()
+    raise RuntimeError(f"every portfolio entry failed: {errors[0]}")
+
+
+def race_lines(lines, entries=DEFAULT_ENTRIES, timeout=None):
+    for number, line in puzzle_lines(lines):
+        try:
+            name, _ = puzzle_io.parse_line(line)
+        except ValueError as error:
+            yield {"line": number, "error": str(error)}
+            continue
+        result = race(line, entries, timeout)
+        if result is None:
+            yield {"line": number, "name": name, "timeout": True, "ms": round(timeout * 1000, 3)}
+        else:
+            yield {"line": number, "name": name, **result}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Race several solvers on every puzzle in a puzzle file")
+    parser.add_argument("path")
+    parser.add_argument("--entry", action="append", type=parse_entry,
+                        help="strategy[:value order[:seed]], may be repeated (default: a built-in mix)")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per puzzle")
+    args = parser.parse_args(argv)
+
+    with open(args.path) as f:
+        for result in race_lines(f, args.entry or DEFAULT_ENTRIES, args.timeout):
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import random
+
+import bitdomain
+import cage_bounds
+import cage_gac
+import cage_index
+import search_stats
+import trail
+
+
+class region:
+    def __init__(self, cells, operation, target):
+        self.cells = cells
+        self.operation = operation
+        self.target = target
+
+
+def as_region(cage):
+    # Accepts region objects, {'cells', 'operation', 'target'} dicts or (cells, operation, target) tuples
+    if isinstance(cage, region):
+        return cage
+    if isinstance(cage, dict):
+        return region(list(cage['cells']), cage['operation'], cage['target'])
+    cells, operation, target = cage
+    return region(list(cells), operation, target)
+
+
+class Puzzle:
+    # A KenKen instance compiled once from its cage list. Cells are addressed
+    # either as (x, y) or by the integer id x * grid_size + y; every table that
+    # the solvers need (cage index, peers, valid cage tuples, checkers) is built
+    # here so that solving the same puzzle again, or with another strategy,
+    # costs nothing extra.
+    def __init__(self, grid_size, regions, region_tuples=None):
+        # region_tuples, when given, replaces the enumerated cage tuples (e.g. to
+        # reuse them across puzzles that share cages, or to narrow a cage)
+        self.grid_size = grid_size
+        self.regions = [as_region(cage) for cage in regions]
+        self.region_cells = [cage.cells for cage in self.regions]
+        self.region_ids = [[x * grid_size + y for (x, y) in cells] for cells in self.region_cells]
+        self.cell_region, self.line_peers, self.peers = cage_index.build_indexes(grid_size, self.region_cells)
+        if region_tuples is None:
+            region_tuples = [cage_gac.cage_tuples(cage.cells, cage.operation, cage.target, grid_size)
+                             for cage in self.regions]
+        self.region_tuples = region_tuples
+        self.checkers = [cage_gac.make_checker(cage.operation, cage.target) for cage in self.regions]
+        self.partial_checkers = [cage_bounds.make_partial_checker(cage.operation, cage.target, grid_size)
+                                 for cage in self.regions]
+
+    def check_region(self, index, grid):
+        # Whether the cage's values hit the target or, while it has an empty
+        # cell, can still reach it
+        values = [grid[x][y] for (x, y) in self.region_cells[index]]
+        if 0 in values:
+            return self.partial_checkers[index](values)
+        return self.checkers[index](values)
+
+    def revise_bounds(self, index, domains, trail=None):
+        # cage_bounds.revise for cage index: the changed cells, or None on a wipeout
+        cage = self.regions[index]
+        return cage_bounds.revise(domains, cage.cells, cage.operation, cage.target, self.grid_size, trail)
+
+    def check_solution(self, grid):
+        full = set(range(1, self.grid_size + 1))
+        for i in range(self.grid_size):
+            if set(grid[i]) != full or {grid[j][i] for j in range(self.grid_size)} != full:
+                return False
+        return all(self.checkers[index]([grid[x][y] for (x, y) in cells])
+                   for index, cells in enumerate(self.region_cells))
+
+
+def as_puzzle(grid_size, regions=None):
+    # Solvers take either a compiled Puzzle or the raw (grid_size, regions) pair
+    if isinstance(grid_size, Puzzle):
+        return grid_size
+    return Puzzle(grid_size, regions)
+
+
+class GridSolver:
+    # The search state every solver class shares: a grid over a compiled
+    # Puzzle, row/column value masks, bitmask domains on an undo trail and the
+    # search counters. Subclasses add the search itself; one that keeps MRV
+    # buckets sets self.buckets and assign/unassign keep them in step.
+    def __init__(self, grid_size, regions=None, value_order='ascending', seed=None, stats=True):
+        self.puzzle = as_puzzle(grid_size, regions)
+        self.grid_size = n = self.puzzle.grid_size
+        self.regions = self.puzzle.regions
+        self.grid = [[0] * n for _ in range(n)]
+        self.row_used = [0] * n
+        self.col_used = [0] * n
+        self.domains = bitdomain.new_domains(n)
+        self.trail = trail.Trail(self.domains)
+        self.value_order = value_order
+        self.rng = random.Random(seed)
+        self.buckets = None
+        self.stats = search_stats.make_stats(stats)
+        self.cell_region = self.puzzle.cell_region
+        self.line_peers = self.puzzle.line_peers
+        self.peers = self.puzzle.peers
+        self.region_tuples = self.puzzle.region_tuples
+
+    def _initial_constraints(self):
+        for i in range(self.grid_size):
+            for j in range(self.grid_size):
+                self.domains[i][j] = self.filter_domain(i, j, self.domains[i][j])
+
+        for index in range(len(self.regions)):
+            self._region_constraint(index)
+
+    def filter_domain(self, row, col, domain):
+        # Remove values already present in the row or column
+        return domain & ~(self.row_used[row] | self.col_used[col])
+
+    def _region_constraint(self, index):
+        for (x, y) in self.regions[index].cells:
+            self.domains[x][y] = self.filter_region_domain(x, y, index)
+
+    def filter_region_domain(self, x, y, index):
+        new_domain = 0
+        for value in bitdomain.values(self.domains[x][y]):
+            if self.valid_region_value(x, y, value, index):
+                new_domain |= bitdomain.bit(value)
+        return new_domain
+
+    def valid_region_value(self, x, y, value, index):
+        original_value = self.grid[x][y]
+        self.grid[x][y] = value
+        result = self.puzzle.check_region(index, self.grid)
+        self.grid[x][y] = original_value
+        return result
+
+    def ordered_values(self, x, y):
+        return bitdomain.ordered_values(self.domains[x][y], self.value_order, self.rng)
+
+    def prune_line_peers(self, x, y, value):
+        # Remove the value from unassigned row/column peers, recording it on the trail
+        value_bit = 1 << value
+        for (i, j) in self.line_peers[x][y]:
+            if self.grid[i][j] == 0 and self.trail.remove(i, j, value_bit) and not self.domains[i][j]:
+                self.stats.fc_failures += 1
+                return False
+        return True
+
+    def forward_check(self, x, y, value):
+        # prune_line_peers, then narrow the cage by its arithmetic bounds
+        if not self.prune_line_peers(x, y, value):
+            return False
+        index = self.cell_region[x][y]
+        if index >= 0:
+            self.trail.restrict(x, y, 1 << value)
+            if self.puzzle.revise_bounds(index, self.domains, self.trail) is None:
+                self.stats.fc_failures += 1
+                return False
+        return True
+
+    def assign(self, x, y, value):
+        self.grid[x][y] = value
+        if self.buckets is not None:
+            self.buckets.remove(x, y)
+        self.row_used[x] |= 1 << value
+        self.col_used[y] |= 1 << value
+
+    def unassign(self, x, y):
+        keep = ~(1 << self.grid[x][y])
+        self.row_used[x] &= keep
+        self.col_used[y] &= keep
+        self.grid[x][y] = 0
+        if self.buckets is not None:
+            self.buckets.restore(x, y)
+
+    def assign_grid(self, grid):
+        # Fills in a complete grid found some other way (exact cover, SAT, the
+        # solution cache) so that the masks and buckets match it
+        for x, row in enumerate(grid):
+            for y, value in enumerate(row):
+                self.assign(x, y, value)
+
+    def is_valid_assignment(self, x, y, value):
+        # The value is not yet used in the row or column
+        return not (self.row_used[x] | self.col_used[y]) >> value & 1
+
+    def is_consistent(self, x, y, value):
+        # is_valid_assignment, and the cage can still reach its target
+        if (self.row_used[x] | self.col_used[y]) >> value & 1:
+            return False
+
+        index = self.cell_region[x][y]
+        if index >= 0 and not self.valid_region_value(x, y, value, index):
+            return False
+        return True
+
+    def print_grid(self):
+        for row in self.grid:
+            print("| " + " | ".join(map(str, row)) + " |")
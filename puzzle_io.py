@@ -0,0 +1,137 @@
+# Puzzle files hold one puzzle per line, in either of two forms:
+#
+#   compact text:  <name> <N> <cage> <cage> ...
+#                  where a cage is <op><target>:<cell id>,<cell id>,...
+#                  with cell id = x * N + y and op one of + - * / =
+#                  ('=' marks a single-cell cage, ' ' in region objects)
+#                  e.g.  easy4 4 *24:0,1,4 /2:2,3 -3:5,6 -1:7,11 +5:8,9 +6:10,14,15 -3:12,13
+#
+#   JSON:          {"name": ..., "size": N, "cages": [{"cells": [[x, y], ...],
+#                   "operation": op, "target": t}, ...]}
+#
+# Blank lines and lines starting with '#' are skipped. Every puzzle is checked
+# when it is parsed and a ValueError names the first impossible cage.
+
+import json
+
+import puzzle
+
+OPERATIONS = ('+', '-', '*', '/', ' ')
+
+
+def encode(model, name='-'):
+    n = model.grid_size
+    cages = []
+    for cage, ids in zip(model.regions, model.region_ids):
+        op = '=' if cage.operation == ' ' else cage.operation
+        cages.append(f"{op}{cage.target}:{','.join(map(str, ids))}")
+    return f"{name} {n} {' '.join(cages)}"
+
+
+def decode(line):
+    fields = line.split()
+    if len(fields) < 3:
+        raise ValueError(f"expected '<name> <N> <cages...>', got {line!r}")
+    name = fields[0]
+    n = int(fields[1])
+    regions = []
+    for token in fields[2:]:
+        head, _, ids = token.partition(':')
+        if not ids or not head:
+            raise ValueError(f"bad cage {token!r}")
+        op = ' ' if head[0] == '=' else head[0]
+        cells = [divmod(int(cell), n) for cell in ids.split(',')]
+        regions.append(puzzle.region(cells, op, int(head[1:])))
+    return name, load(n, regions)
+
+
+def to_json(model, name='-'):
+    return json.dumps({
+        "name": name,
+        "size": model.grid_size,
+        "cages": [{"cells": [list(cell) for cell in cage.cells], "operation": cage.operation, "target": cage.target}
+                  for cage in model.regions],
+    })
+
+
+def from_json(line):
+    data = json.loads(line)
+    try:
+        regions = [puzzle.region([tuple(cell) for cell in cage["cells"]], cage["operation"], cage["target"])
+                   for cage in data["cages"]]
+        return data.get("name", "-"), load(data["size"], regions)
+    except KeyError as error:
+        raise ValueError(f"bad puzzle line: missing key {error}") from None
+    except (TypeError, AttributeError) as error:
+        raise ValueError(f"bad puzzle line: {error}") from None
+
+
+def parse_line(line):
+    line = line.strip()
+    if line.startswith('{'):
+        return from_json(line)
+    return decode(line)
+
+
+def read_puzzles(lines):
+    # Yields (name, Puzzle) one line at a time; lines may be any iterable, e.g. an open file
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield parse_line(line)
+        except ValueError as error:
+            raise ValueError(f"line {number}: {error}") from None
+
+
+def read_file(path):
+    with open(path) as f:
+        yield from read_puzzles(f)
+
+
+def write_puzzles(path, named_models, as_json=False):
+    with open(path, 'w') as f:
+        for name, model in named_models:
+            f.write((to_json(model, name) if as_json else encode(model, name)) + '\n')
+
+
+def load(grid_size, regions):
+    check_cages(grid_size, regions)
+    model = puzzle.Puzzle(grid_size, regions)
+    for index, tuples in enumerate(model.region_tuples):
+        if not tuples:
+            cage = model.regions[index]
+            raise ValueError(f"cage {index} ({cage.operation!r} {cage.target}) has no valid filling")
+    return model
+
+
+def check_cages(grid_size, regions):
+    if grid_size < 1:
+        raise ValueError(f"grid size must be positive, got {grid_size}")
+    seen = set()
+    for index, cage in enumerate(regions):
+        cage = puzzle.as_region(cage)
+        op, target, cells = cage.operation, cage.target, cage.cells
+        if op not in OPERATIONS:
+            raise ValueError(f"cage {index}: unknown operation {op!r}")
+        if not cells:
+            raise ValueError(f"cage {index}: no cells")
+        for (x, y) in cells:
+            if not (0 <= x < grid_size and 0 <= y < grid_size):
+                raise ValueError(f"cage {index}: cell ({x}, {y}) is outside the {grid_size}x{grid_size} grid")
+            if (x, y) in seen:
+                raise ValueError(f"cage {index}: cell ({x}, {y}) is already in another cage")
+            seen.add((x, y))
+        if op == ' ' and (len(cells) != 1 or not 1 <= target <= grid_size):
+            raise ValueError(f"cage {index}: a single-cell cage needs one cell and a target in 1..{grid_size}")
+        if op == '-' and not 1 <= target < grid_size:
+            raise ValueError(f"cage {index}: difference {target} is impossible with values 1..{grid_size}")
+        if op == '/' and not 2 <= target <= grid_size:
+            raise ValueError(f"cage {index}: quotient {target} is impossible with values 1..{grid_size}")
+        if op in '-/' and len(cells) < 2:
+            raise ValueError(f"cage {index}: {op!r} needs at least two cells")
+        if op == '+' and not len(cells) <= target <= len(cells) * grid_size:
+            raise ValueError(f"cage {index}: sum {target} is out of range for {len(cells)} cells")
+    if len(seen) != grid_size * grid_size:
+        raise ValueError(f"cages cover {len(seen)} of {grid_size * grid_size} cells")
@@ -0,0 +1,55 @@
+# Event counters shared by every solver. A solver takes stats=True (count into
+# a fresh SearchStats), stats=False (don't count) or an existing SearchStats to
+# add its counts to, e.g. across a batch.
+#
+# With counting off the solver gets a NoStats: the per-event increments still
+# land on it (one attribute write each) but it is falsy, so the tallies that
+# cost more than an increment are skipped, and it reports nothing.
+
+FIELDS = ('nodes', 'backtracks', 'revisions', 'prunes', 'fc_failures', 'ac3_failures',
+          'backjumps', 'nogoods')
+
+
+class SearchStats:
+    # nodes:        cells chosen for branching
+    # backtracks:   values tried and then undone
+    # revisions:    arcs revised by AC-3 (cage and row/column arcs)
+    # prunes:       values removed from domains by AC-3
+    # fc_failures:  forward checks that emptied a domain
+    # ac3_failures: AC-3 runs that emptied a domain or killed a cage
+    # backjumps:    levels skipped by conflict-directed backjumping
+    # nogoods:      nogoods recorded by conflict-directed backjumping
+    __slots__ = FIELDS
+
+    def __init__(self):
+        for field in FIELDS:
+            setattr(self, field, 0)
+
+    def __bool__(self):
+        return True
+
+    def add(self, other):
+        for field in FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __repr__(self):
+        return f"SearchStats({', '.join(f'{field}={getattr(self, field)}' for field in FIELDS)})"
+
+
+class NoStats(SearchStats):
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def as_dict(self):
+        return {}
+
+
+def make_stats(stats=True):
+    if isinstance(stats, SearchStats):
+        return stats
+    return SearchStats() if stats else NoStats()
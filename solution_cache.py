@@ -0,0 +1,129 @@
+# Solutions remembered across runs. A puzzle is keyed by a hash of its
+# canonical form: the cages as (operation, target, sorted cell ids), sorted,
+# taken in whichever of the puzzle's two orientations (as given or transposed)
+# sorts first. Listing the cages or their cells in another order, or
+# transposing the grid, gives the same key. Grids are stored in the canonical
+# orientation and transposed back on the way out when needed.
+#
+# Lookups go through an in-memory LRU first and then an SQLite file, which
+# several processes can share. Puzzles without a solution are cached too.
+#
+#   cache = SolutionCache('solutions.db')
+#   grid = cache.solve(model, STRATEGIES['mac'])   # solved once, then instant
+#   CSP(model).solve('mac', cache=cache)          # or MRV_6x6(model).solve(cache=cache)
+#   python batch.py corpus.txt --cache solutions.db
+
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def transpose(grid):
+    return [list(column) for column in zip(*grid)]
+
+
+def canonical_form(model):
+    # Returns (form, transposed): the cages in canonical order and whether
+    # that order came from the transposed grid
+    n = model.grid_size
+    as_given = sorted((cage.operation, cage.target, tuple(sorted(x * n + y for (x, y) in cage.cells)))
+                      for cage in model.regions)
+    flipped = sorted((cage.operation, cage.target, tuple(sorted(y * n + x for (x, y) in cage.cells)))
+                     for cage in model.regions)
+    if flipped < as_given:
+        return flipped, True
+    return as_given, False
+
+
+def puzzle_key(model):
+    form, transposed = canonical_form(model)
+    digest = hashlib.sha256(repr((model.grid_size, form)).encode()).hexdigest()
+    return digest, transposed
+
+
+class SolutionCache:
+    def __init__(self, path=None, maxsize=1024):
+        # path=None keeps the cache in memory only
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, size INTEGER, grid TEXT)")
+            self.db.commit()
+
+    def _remember(self, key, grid):
+        self.memory[key] = grid
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def _lookup(self, key):
+        grid = self.memory.get(key, _MISSING)
+        if grid is not _MISSING:
+            self.memory.move_to_end(key)
+            return grid
+        if self.db is not None:
+            row = self.db.execute("SELECT grid FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                grid = json.loads(row[0])
+                self._remember(key, grid)
+                return grid
+        return _MISSING
+
+    def get(self, model, default=None):
+        # The cached grid in model's orientation, None for a puzzle known to have
+        # no solution, or default when the puzzle is not cached
+        key, transposed = puzzle_key(model)
+        grid = self._lookup(key)
+        if grid is not _MISSING and grid is not None:
+            grid = transpose(grid) if transposed else [row[:] for row in grid]
+            if not model.check_solution(grid):
+                grid = _MISSING  # a hash collision or a damaged store
+        if grid is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return grid
+
+    def put(self, model, grid):
+        key, transposed = puzzle_key(model)
+        if grid is not None:
+            grid = transpose(grid) if transposed else [row[:] for row in grid]
+        self._remember(key, grid)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                            (key, model.grid_size, json.dumps(grid)))
+            self.db.commit()
+
+    def solve(self, model, strategy, **options):
+        # strategy(model, **options) through the cache, strategy being one of
+        # strategies.STRATEGIES
+        grid = self.get(model, _MISSING)
+        if grid is _MISSING:
+            grid = strategy(model, **options)
+            self.put(model, grid)
+        return grid
+
+    def solve_with(self, solver, search, *args):
+        # solver.search(*args) for a puzzle.GridSolver through the cache; on a
+        # hit the cached grid is assigned into the solver instead
+        grid = self.get(solver.puzzle, _MISSING)
+        if grid is _MISSING:
+            solved = search(*args)
+            self.put(solver.puzzle, solver.grid if solved else None)
+            return solved
+        if grid is None:
+            return False
+        solver.assign_grid(grid)
+        return True
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
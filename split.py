@@ -0,0 +1,165 @@
+# Solve one hard puzzle on several cores by splitting the top of its search tree:
+#
+#   python split.py puzzles/instances.txt --workers 4
+#   python split.py puzzles/instances.txt --workers 4 --all
+#
+# The MAC search is expanded from the root, one MRV cell per level, until there
+# are several open subtrees per worker. Each subtree is sent to a process pool
+# as the list of (x, y, value) choices leading to it. Workers take subtrees off
+# the shared queue as they go idle, so a branch that dies early does not leave
+# its worker waiting. In first-solution mode the first grid found stops every
+# other worker.
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import ac3_solver
+import puzzle_io
+import stack_search
+from batch import puzzle_lines
+
+STOP_CHECK_STEPS = 64
+
+_stop = None
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def replay(model, prefix):
+    # A CSP with the MAC setup done and every choice in prefix assigned and propagated
+    csp = ac3_solver.CSP(model)
+    if not csp.prepare_mac():
+        return None
+    for (x, y, value) in prefix:
+        csp.assign(x, y, value)
+        if not csp.propagate(x, y):
+            return None
+    return csp
+
+
+def split(csp, depth, prefix=(), open_prefixes=None, solved=None):
+    # Enumerates the subtrees `depth` choices below the current node. Choices
+    # that complete the grid early go to solved, dead ends are dropped.
+    if open_prefixes is None:
+        open_prefixes, solved = [], []
+    cell = csp.buckets.select()
+    if cell is None:
+        solved.append([row[:] for row in csp.grid])
+    elif depth == 0:
+        open_prefixes.append(prefix)
+    else:
+        x, y = cell
+        for value in csp.ordered_values(x, y):
+            mark = csp.trail.mark()
+            csp.assign(x, y, value)
+            if csp.propagate(x, y):
+                split(csp, depth - 1, prefix + ((x, y, value),), open_prefixes, solved)
+            csp.unassign(x, y)
+            csp.trail.undo(mark)
+    return open_prefixes, solved
+
+
+def search(csp, solutions, all_solutions):
+    # The MAC search (stack_search.StackSearch) that can collect every solution
+    # and gives up once another worker has found the answer, checked every
+    # STOP_CHECK_STEPS steps
+    stack = stack_search.StackSearch(csp)
+    while True:
+        found = stack.run(max_steps=STOP_CHECK_STEPS)
+        if _stop is not None and _stop.is_set():
+            return True
+        if found is None:
+            continue
+        if not found:
+            return False
+        solutions.append([row[:] for row in csp.grid])
+        if not all_solutions:
+            return True
+
+
+def _solve_subtree(line, prefix, all_solutions):
+    _, model = puzzle_io.parse_line(line)
+    csp = replay(model, prefix)
+    solutions = []
+    if csp is not None:
+        search(csp, solutions, all_solutions)
+    return solutions
+
+
+def solve_split(model, workers=None, all_solutions=False, parts_per_worker=8):
+    # Returns the first grid found (or None), or with all_solutions the list of
+    # every solution grid
+    workers = workers or os.cpu_count() or 1
+    csp = ac3_solver.CSP(model)
+    if not csp.prepare_mac():
+        return [] if all_solutions else None
+
+    # Deepen the split until there is enough work to balance across the pool
+    depth = 1
+    open_prefixes, solved = split(csp, depth)
+    while open_prefixes and len(open_prefixes) < workers * parts_per_worker:
+        depth += 1
+        deeper, solved = split(csp, depth)
+        if len(deeper) <= len(open_prefixes) and not solved:
+            break
+        open_prefixes = deeper
+    if solved and not all_solutions:
+        return solved[0]
+
+    line = puzzle_io.encode(csp.puzzle)
+    stop = multiprocessing.Event()
+    solutions = list(solved)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(stop,)) as executor:
+        futures = [executor.submit(_solve_subtree, line, prefix, all_solutions) for prefix in open_prefixes]
+        if all_solutions:
+            for future in futures:
+                solutions.extend(future.result())
+            return solutions
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                found = future.result()
+                if found:
+                    stop.set()
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    return found[0]
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve each puzzle by splitting its search tree across processes")
+    parser.add_argument("path")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes, 0 for one per CPU")
+    parser.add_argument("--all", action="store_true", help="find every solution instead of the first")
+    args = parser.parse_args(argv)
+
+    with open(args.path) as f:
+        for number, line in puzzle_lines(f):
+            try:
+                name, model = puzzle_io.parse_line(line)
+            except ValueError as error:
+                result = {"line": number, "error": str(error)}
+            else:
+                start = time.perf_counter()
+                found = solve_split(model, args.workers, args.all)
+                elapsed = round((time.perf_counter() - start) * 1000, 3)
+                if args.all:
+                    result = {"line": number, "name": name, "solutions": len(found), "grids": found, "ms": elapsed}
+                else:
+                    result = {"line": number, "name": name, "solved": found is not None, "grid": found,
+                              "ms": elapsed}
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# The MAC search of CSP.backtrack_mac as a loop over an explicit choice stack
+# instead of one Python frame per assigned cell, for large grids (a 25x25
+# puzzle is 625 levels deep) and for search that has to be paused:
+#
+#   search = StackSearch(csp)          # csp.prepare_mac() already done
+#   while (result := search.run(max_steps=1000)) is None:
+#       ...                            # do other work between slices
+#
+# CSP.solutions (and so count_solutions / is_unique), the generator's budgeted
+# uniqueness search and split's subtree workers all run on it.
+#
+# The stack holds, per level, the branching cell, the iterator over its
+# remaining values and the trail mark taken before its current value. Its
+# arrays are allocated once for N*N levels. Cells, value order, and the
+# node and backtrack counts are the same as backtrack_mac's.
+
+
+class StackSearch:
+    def __init__(self, csp):
+        size = csp.grid_size * csp.grid_size
+        self.csp = csp
+        self.cells = [None] * size
+        self.pending = [None] * size
+        self.marks = [0] * size
+        self.depth = 0          # open levels; the top one has a value assigned unless expand is set
+        self.expand = True      # the next step branches on a new cell
+        self.nodes = 0          # cells branched on by this search
+
+    def run(self, max_steps=None, max_nodes=None):
+        # Returns True with csp.grid solved, False once the search space is
+        # exhausted, or None after max_steps steps (a step branches on a cell or
+        # takes back a value) or when branching once more would go past
+        # max_nodes in total. Calling run again after True resumes the search
+        # for the next solution; after None it carries on where it stopped.
+        csp = self.csp
+        stats = csp.stats
+        trail = csp.trail
+        cells, pending, marks = self.cells, self.pending, self.marks
+        steps = 0
+        while True:
+            if self.expand:
+                cell = csp.select_unassigned_cell()
+                if cell is None:
+                    self.expand = False
+                    return True
+                if max_nodes is not None and self.nodes >= max_nodes:
+                    return None
+                self.expand = False
+                self.nodes += 1
+                stats.nodes += 1
+                cells[self.depth] = cell
+                pending[self.depth] = iter(csp.ordered_values(*cell))
+                self.depth += 1
+            else:
+                if self.depth == 0:
+                    return False
+                x, y = cells[self.depth - 1]
+                stats.backtracks += 1
+                csp.unassign(x, y)
+                trail.undo(marks[self.depth - 1])
+
+            level = self.depth - 1
+            x, y = cells[level]
+            values = pending[level]
+            for value in values:
+                marks[level] = trail.mark()
+                csp.assign(x, y, value)
+                if csp.propagate(x, y):
+                    self.expand = True
+                    break
+                stats.backtracks += 1
+                csp.unassign(x, y)
+                trail.undo(marks[level])
+            else:
+                pending[level] = None
+                self.depth -= 1
+
+            steps += 1
+            if max_steps is not None and steps >= max_steps:
+                return None
+
+    def unwind(self):
+        # Takes back every open assignment; the search then reports exhaustion
+        csp = self.csp
+        for level in range(self.depth - 1, -1, -1):
+            x, y = self.cells[level]
+            csp.unassign(x, y)
+            csp.trail.undo(self.marks[level])
+            self.pending[level] = None
+        self.depth = 0
+        self.expand = False
+
+    def solutions(self):
+        # Yields a copy of every solution grid. Closing the generator early
+        # undoes the open assignments.
+        try:
+            while self.run():
+                yield [row[:] for row in self.csp.grid]
+        finally:
+            self.unwind()
+
+
+def solve(csp):
+    return csp.prepare_mac() and StackSearch(csp).run()
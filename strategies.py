@@ -0,0 +1,68 @@
+# Every solver behind one signature: strategy(model, value_order, seed, stats) -> solved grid or None
+# stats is a SearchStats that the run's counts are added to, or None
+
+import ac3_solver
+import fc_solver
+import mrv_solver
+
+
+def solve_ac3(model, value_order='ascending', seed=None, stats=None):
+    csp = ac3_solver.CSP(model, value_order=value_order, seed=seed, stats=stats)
+    return csp.grid if csp.solve() else None
+
+
+def solve_mac(model, value_order='ascending', seed=None, stats=None):
+    csp = ac3_solver.CSP(model, value_order=value_order, seed=seed, stats=stats)
+    return csp.grid if csp.solve('mac') else None
+
+
+def solve_stack(model, value_order='ascending', seed=None, stats=None):
+    csp = ac3_solver.CSP(model, value_order=value_order, seed=seed, stats=stats)
+    return csp.grid if csp.solve('stack') else None
+
+
+def solve_cbj(model, value_order='ascending', seed=None, stats=None):
+    csp = ac3_solver.CSP(model, value_order=value_order, seed=seed, stats=stats)
+    return csp.grid if csp.solve('cbj') else None
+
+
+def solve_dlx(model, value_order='ascending', seed=None, stats=None):
+    # Exact cover has no per-cell value order, so value_order and seed are unused
+    csp = ac3_solver.CSP(model, stats=stats)
+    return csp.grid if csp.solve('dlx') else None
+
+
+def solve_sat(model, value_order='ascending', seed=None, stats=None):
+    # The CDCL solver picks its own branching, so value_order and seed are unused
+    csp = ac3_solver.CSP(model, stats=stats)
+    return csp.grid if csp.solve('sat') else None
+
+
+def solve_mrv(model, value_order='ascending', seed=None, stats=None):
+    csp = mrv_solver.MRV_6x6(model, value_order=value_order, seed=seed, stats=stats)
+    return csp.grid if csp.solve() else None
+
+
+def solve_fc(model, value_order='ascending', seed=None, stats=None):
+    return fc_solver.kenken_solver(model, value_order=value_order, seed=seed, stats=stats)
+
+
+STRATEGIES = {
+    'ac3': solve_ac3,
+    'mac': solve_mac,
+    'stack': solve_stack,
+    'cbj': solve_cbj,
+    'dlx': solve_dlx,
+    'sat': solve_sat,
+    'mrv': solve_mrv,
+    'fc': solve_fc,
+}
+
+
+def solutions(model):
+    # Every solution grid, lazily, from the MAC search
+    return ac3_solver.CSP(model, stats=False).solutions()
+
+
+def count_solutions(model, limit=None):
+    return ac3_solver.CSP(model, stats=False).count_solutions(limit)
@@ -0,0 +1,34 @@
+class Trail:
+    # Undo log for a grid of bitmask domains. Every removal is recorded as
+    # (x, y, removed_bits), so backtracking to a mark only touches the cells
+    # that changed since the mark was taken. on_change(x, y), when set, is called
+    # after every change so that derived structures (MRV buckets) stay in sync.
+    def __init__(self, domains):
+        self.domains = domains
+        self.entries = []
+        self.on_change = None
+
+    def mark(self):
+        return len(self.entries)
+
+    def remove(self, x, y, mask):
+        removed = self.domains[x][y] & mask
+        if removed:
+            self.domains[x][y] ^= removed
+            self.entries.append((x, y, removed))
+            if self.on_change is not None:
+                self.on_change(x, y)
+        return removed
+
+    def restrict(self, x, y, keep):
+        return self.remove(x, y, ~keep)
+
+    def undo(self, mark):
+        entries = self.entries
+        domains = self.domains
+        on_change = self.on_change
+        while len(entries) > mark:
+            x, y, removed = entries.pop()
+            domains[x][y] |= removed
+            if on_change is not None:
+                on_change(x, y)